@@ -0,0 +1,236 @@
+from position import (Move, SQUARES, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK, COLORS, COLOR_MASK,
+                      PROMOTIONS, CASTLING_RULES, EP_ROWS, ROW_COL)
+import time
+
+# Bitboards use bit index 8*row + col, with row 0 being black's back rank like the mailbox.
+# MAILBOX maps a bit index to its Position.squares index.
+MAILBOX = SQUARES
+BIT = {sq: bit for bit, sq in enumerate(SQUARES)}
+
+def _on_board(row, col):
+    return 0 <= row < 8 and 0 <= col < 8
+
+def _step_table(steps):
+    table = []
+    for bit in range(64):
+        row, col = divmod(bit, 8)
+        mask = 0
+        for dr, dc in steps:
+            if _on_board(row + dr, col + dc):
+                mask |= 1 << (8 * (row + dr) + col + dc)
+        table.append(mask)
+    return table
+
+KNIGHT_ATTACKS = _step_table([(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)])
+KING_ATTACKS = _step_table([(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)])
+# squares a pawn of the given colour attacks from each square
+PAWN_ATTACKS = {WHITE: _step_table([(-1,-1), (-1,1)]), BLACK: _step_table([(1,-1), (1,1)])}
+
+# Classical ray lookups: RAYS[direction][bit] holds every square from bit to the edge.
+# Rays that run towards higher bit indices stop at the lowest blocker, the others at the highest.
+ROOK_DIRECTIONS = [(1,0), (0,1), (-1,0), (0,-1)]
+BISHOP_DIRECTIONS = [(1,1), (1,-1), (-1,1), (-1,-1)]
+RAYS = {}
+for _dr, _dc in ROOK_DIRECTIONS + BISHOP_DIRECTIONS:
+    _table = []
+    for _bit in range(64):
+        _row, _col = divmod(_bit, 8)
+        _mask = 0
+        _r, _c = _row + _dr, _col + _dc
+        while _on_board(_r, _c):
+            _mask |= 1 << (8 * _r + _c)
+            _r, _c = _r + _dr, _c + _dc
+        _table.append(_mask)
+    RAYS[(_dr, _dc)] = _table
+# every square on a line (rank, file or diagonal) through each square, for spotting possible pins
+QUEEN_LINES = [0] * 64
+for _table in RAYS.values():
+    for _bit in range(64):
+        QUEEN_LINES[_bit] |= _table[_bit]
+POSITIVE_RAYS = {d: RAYS[d] for d in RAYS if d[0] * 8 + d[1] > 0}
+NEGATIVE_RAYS = {d: RAYS[d] for d in RAYS if d[0] * 8 + d[1] < 0}
+ROOK_RAYS = ([RAYS[d] for d in ROOK_DIRECTIONS if d in POSITIVE_RAYS], [RAYS[d] for d in ROOK_DIRECTIONS if d in NEGATIVE_RAYS])
+BISHOP_RAYS = ([RAYS[d] for d in BISHOP_DIRECTIONS if d in POSITIVE_RAYS], [RAYS[d] for d in BISHOP_DIRECTIONS if d in NEGATIVE_RAYS])
+
+def slider_attacks(rays, bit, occupied):
+    positive, negative = rays
+    attacks = 0
+    for table in positive:
+        ray = table[bit]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= table[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for table in negative:
+        ray = table[bit]
+        blockers = ray & occupied
+        if blockers:
+            ray ^= table[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+def rook_attacks(bit, occupied):
+    return slider_attacks(ROOK_RAYS, bit, occupied)
+
+def bishop_attacks(bit, occupied):
+    return slider_attacks(BISHOP_RAYS, bit, occupied)
+
+def bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+class BitboardGenerator():
+    """Move generator over one 64-bit integer per piece code.
+
+    Produces the same moves as the mailbox generator in Position, so either can
+    back Position.get_all_possible_moves (see Position(movegen=...)). The bitboards are the
+    position's own, which its make/undo keep up to date for this generator.
+    """
+    def __init__(self, position):
+        self.position = position
+
+
+    def is_attacked(self, bbs, bit, color, occupied, removed=0):
+        """True if a piece of the given colour attacks bit; pieces on removed are ignored."""
+        keep = ~removed
+        if KNIGHT_ATTACKS[bit] & bbs[color | KNIGHT] & keep:
+            return True
+        if KING_ATTACKS[bit] & bbs[color | KING] & keep:
+            return True
+        if PAWN_ATTACKS[color ^ COLOR_MASK][bit] & bbs[color | PAWN] & keep:
+            return True
+        queens = bbs[color | QUEEN]
+        if bishop_attacks(bit, occupied) & (bbs[color | BISHOP] | queens) & keep:
+            return True
+        if rook_attacks(bit, occupied) & (bbs[color | ROOK] | queens) & keep:
+            return True
+        return False
+
+    def get_all_possible_moves(self, player: str = ['white', 'black'], captures_only=False):
+        color = COLORS[player]
+        enemy = color ^ COLOR_MASK
+        bbs = self.position.bitboards
+        own = 0
+        theirs = 0
+        for kind in range(PAWN, KING + 1):
+            own |= bbs[color | kind]
+            theirs |= bbs[enemy | kind]
+        occupied = own | theirs
+        empty = ~occupied & 0xFFFFFFFFFFFFFFFF
+
+        movesList = []
+        # (from bit, to bit, piece)
+        candidates = []
+        pawn = color | PAWN
+        # captures only: pieces may only land on enemy pieces, pawns may still push to promote
+        targets_mask = theirs if captures_only else ~own
+        if captures_only:
+            empty &= 0xFF000000000000FF
+        if color == WHITE:
+            single = (bbs[pawn] >> 8) & empty
+            double = ((single & 0x0000FF0000000000) >> 8) & empty
+            push = -8
+        else:
+            single = (bbs[pawn] << 8) & empty
+            double = ((single & 0x0000000000FF0000) << 8) & empty
+            push = 8
+        for to in bits(single):
+            candidates.append((to - push, to, pawn))
+        for to in bits(double):
+            candidates.append((to - 2 * push, to, pawn))
+        pawn_attacks = PAWN_ATTACKS[color]
+        for frm in bits(bbs[pawn]):
+            for to in bits(pawn_attacks[frm] & theirs):
+                candidates.append((frm, to, pawn))
+        for kind in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            piece = color | kind
+            for frm in bits(bbs[piece]):
+                if kind == KNIGHT:
+                    targets = KNIGHT_ATTACKS[frm]
+                elif kind == KING:
+                    targets = KING_ATTACKS[frm]
+                elif kind == BISHOP:
+                    targets = bishop_attacks(frm, occupied)
+                elif kind == ROOK:
+                    targets = rook_attacks(frm, occupied)
+                else:
+                    targets = bishop_attacks(frm, occupied) | rook_attacks(frm, occupied)
+                for to in bits(targets & targets_mask):
+                    candidates.append((frm, to, piece))
+
+        king_bb = bbs[color | KING]
+        promotion_rank = 0 if color == WHITE else 7
+        # Out of check, a move by any other piece than the king can only expose the king if the
+        # piece leaves a line through the king, so only those moves and king moves are tested
+        if king_bb and not self.is_attacked(bbs, king_bb.bit_length() - 1, enemy, occupied):
+            exposed = QUEEN_LINES[king_bb.bit_length() - 1]
+        else:
+            exposed = ~0
+        for frm, to, piece in candidates:
+            frm_bb = 1 << frm
+            to_bb = 1 << to
+            # own king after the move, the captured piece (if any) no longer attacks
+            king = to_bb if piece == color | KING else king_bb
+            if king and (king != king_bb or frm_bb & exposed):
+                occupied_after = (occupied ^ frm_bb) | to_bb
+                if self.is_attacked(bbs, king.bit_length() - 1, enemy, occupied_after, to_bb):
+                    continue
+            if piece == pawn and to >> 3 == promotion_rank:
+                for pr in PROMOTIONS:
+                    movesList.append(Move(MAILBOX[frm], MAILBOX[to], piece, special_move="promote", promoted=color | pr))
+            else:
+                movesList.append(Move(MAILBOX[frm], MAILBOX[to], piece))
+
+        position = self.position
+        if king_bb:
+            king = king_bb.bit_length() - 1
+            if position.castling and not captures_only and not self.is_attacked(bbs, king, enemy, occupied):
+                for right, king_from, king_to, rook_from, _, empty, safe in CASTLING_RULES[color]:
+                    if (position.castling & right and MAILBOX[king] == king_from and bbs[color | ROOK] >> BIT[rook_from] & 1
+                            and not any(occupied >> BIT[e] & 1 for e in empty)
+                            and not any(self.is_attacked(bbs, BIT[s], enemy, occupied) for s in safe)):
+                        movesList.append(Move(king_from, king_to, color | KING, special_move="castle"))
+
+        ep = position.ep_square
+        if ep and ROW_COL[ep][0] == EP_ROWS[color]:
+            to = BIT[ep]
+            to_bb = 1 << to
+            captured_bb = to_bb << 8 if color == WHITE else to_bb >> 8
+            for frm in bits(PAWN_ATTACKS[enemy][to] & bbs[pawn]):
+                occupied_after = (occupied ^ (1 << frm) ^ captured_bb) | to_bb
+                if king_bb and self.is_attacked(bbs, king_bb.bit_length() - 1, enemy, occupied_after, captured_bb):
+                    continue
+                movesList.append(Move(MAILBOX[frm], ep, pawn, special_move="en_passant"))
+        return movesList
+
+
+if __name__ == '__main__':
+    import random
+    from position import Position
+
+    # play the same random games with both generators and compare speed and move lists
+    random.seed(0)
+    timings = {'mailbox': 0.0, 'bitboard': 0.0}
+    generated = 0
+    for game in range(10):
+        positions = {name: Position(movegen=name) for name in timings}
+        side = 'white'
+        for ply in range(80):
+            moves = {}
+            for name, position in positions.items():
+                start = time.time()
+                moves[name] = position.get_all_possible_moves(side)
+                timings[name] += time.time() - start
+            assert sorted(map(str, moves['mailbox'])) == sorted(map(str, moves['bitboard']))
+            if not moves['mailbox']:
+                break
+            generated += len(moves['mailbox'])
+            choice = str(random.choice(moves['mailbox']))
+            for name, position in positions.items():
+                position.make_move(next(m for m in moves[name] if str(m) == choice))
+            side = 'black' if side == 'white' else 'white'
+    for name, total in timings.items():
+        print(f"{name}: {total:.3f} seconds, {generated / total:.0f} moves per second")
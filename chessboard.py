@@ -1,22 +1,12 @@
 import tkinter as tk
 from PIL import Image, ImageTk
-import copy
 import numpy as np
-class Move():
-    def __init__(self, position, newPos, unitType, special_move = "", promoted = "") -> None:
-        self.position = position
-        self.unit_type = unitType
-        self.new_pos = newPos
-        self.side = ""
-        if unitType.find('black')>=0:
-            self.side = 'black'
-        else:
-            self.side = 'white'
-        self.special_move = special_move
-        self.promoted = promoted
-        self.last_move = None
-    def __str__(self) -> str:
-        return self.unit_type + ': ' +str(self.position) + "->" +  str(self.new_pos) + " - " + self.special_move + " - " + self.promoted
+import queue
+from position import Position, Move, PIECE_NAMES, square
+
+# milliseconds between runs of the calls other threads queue for the Tk thread
+UI_POLL_MS = 20
+
 class ChessBoard(tk.Tk):
     def __init__(self, current_board=None, current_player='white', move_log=[], playable = False, player_side = ""):
         super().__init__()
@@ -29,20 +19,20 @@ class ChessBoard(tk.Tk):
         self.canvas.pack(fill="both", expand=True)
         self.draw_board()
         self.click = False
-        self.player_move = None
+        # moves the player drops, for the game thread to take; calls it wants run on the Tk thread
+        self.player_moves = queue.Queue()
+        self.ui_calls = queue.Queue()
+        self.after(UI_POLL_MS, self._run_ui_calls)
 
-        self.current_board = current_board
-        self.blackCastled = False
-        self.whiteCastled = False
+        # rules state lives in a display-free Position, the window only draws it
+        self.position = Position(current_board, current_player)
         self.piece_images = self.load_piece_images()
         self.draw_pieces()
-        self.previous_board = []
         self.drag_data = {"piece": None, "x": 0, "y": 0}
         self.canvas.bind("<Button-1>", self.start_drag)
         self.canvas.bind("<B1-Motion>", self.drag)
         self.canvas.bind("<ButtonRelease-1>", self.drop)
         
-        self.current_player = current_player
         self.move_log = move_log
         self.playable = playable
         self.playside = ""
@@ -54,10 +44,59 @@ class ChessBoard(tk.Tk):
         self.oldPosY = None
         self.type = None
         self.impactPos = None
-        
-        # Win/lose/draw
-        self.is_checkmated = None # None, 'white', 'black'
-        self.is_stalemated = None # None, 'white', 'black'
+        self.legal_moves = []
+
+    # Rules state and move generation are forwarded to self.position
+    @property
+    def current_board(self):
+        return self.position.current_board
+    @current_board.setter
+    def current_board(self, value):
+        self.position.current_board = value
+    @property
+    def current_player(self):
+        return self.position.current_player
+    @current_player.setter
+    def current_player(self, value):
+        self.position.current_player = value
+    @property
+    def blackCastled(self):
+        return self.position.blackCastled
+    @property
+    def whiteCastled(self):
+        return self.position.whiteCastled
+    @property
+    def last_move(self):
+        return self.position.last_move
+    @property
+    def is_checkmated(self):
+        return self.position.is_checkmated
+    @property
+    def is_stalemated(self):
+        return self.position.is_stalemated
+
+    def get_board(self):
+        return self.position.get_board()
+    def get_all_impact(self, board=None):
+        return self.position.get_all_impact(board)
+    def get_all_possible_moves(self, player: str = ['white', 'black']):
+        return self.position.get_all_possible_moves(player)
+    def make_move(self, move: Move):
+        self.position.make_move(move)
+    def undo_move(self):
+        self.position.undo_move()
+    def impact_pos(self, unitType, pos):
+        return self.position.impact_pos(unitType, pos)
+    def isCheck(self, board=None, player: str = ['white', 'black']):
+        return self.position.isCheck(board, player)
+    def isCheckMate(self, player: str = ['white', 'black']):
+        return self.position.isCheckMate(player)
+    def is_draw(self, player: str = ['white', 'black']):
+        return self.position.is_draw(player)
+    def is_game_over(self):
+        return self.position.is_game_over()
+    def get_winner(self):
+        return self.position.get_winner()
 
     def draw_board(self):
         color = ["#EBECD0", "#739552"]
@@ -96,21 +135,11 @@ class ChessBoard(tk.Tk):
             print(f"Error loading image: {e}")
 
     def draw_pieces(self):
-        starting_board = [
-            ['black_rook', 'black_knight', 'black_bishop', 'black_queen', 'black_king', 'black_bishop', 'black_knight', 'black_rook'],
-            ['black_pawn'] * 8,
-            [''] * 8,
-            [''] * 8,
-            [''] * 8,
-            [''] * 8,
-            ['white_pawn'] * 8,
-            ['white_rook', 'white_knight', 'white_bishop', 'white_queen', 'white_king', 'white_bishop', 'white_knight', 'white_rook']
-        ]
-        if self.current_board is None:
-            self.current_board = starting_board
+        squares = self.position.squares
         for row in range(self.rows):
             for col in range(self.columns):
-                piece = self.current_board[row][col]
+                # piece codes are turned into image/tag names only here
+                piece = PIECE_NAMES[squares[square(row, col)]]
                 if piece != '':
                     piece_image = self.piece_images[piece]
                     self.canvas.create_image(col * self.size + self.size/2, row * self.size + self.size/2,
@@ -140,7 +169,9 @@ class ChessBoard(tk.Tk):
             if tags[0].find("white")==0:
                 self.type = 0 
             else: self.type =1
-            moves = self.impact_pos(tags[0],(row,col))
+            # only legal moves of this piece, so castling, en passant and pins are respected
+            self.legal_moves = [mv for mv in self.get_all_possible_moves(self.playside) if mv.position == (row, col)]
+            moves = [mv.new_pos for mv in self.legal_moves]
             # print(moves)
             for move in moves:
                 row = (move[0])
@@ -218,7 +249,10 @@ class ChessBoard(tk.Tk):
 
             self.move_log.append(Move((r,c),(row,col),tags[0]))
             
-            self.player_move = Move(self.move_log[-1].position, self.move_log[-1].new_pos, self.current_board[self.move_log[-1].position[0]][self.move_log[-1].position[1]])
+            # promotions are listed rook, knight, bishop, queen: the last match promotes to a queen
+            self.player_moves.put([mv for mv in self.legal_moves if mv.new_pos == (row, col)][-1])
+            # no more drags until the game thread hands the turn back
+            self.current_player = 'black' if self.playside == 'white' else 'white'
             
             
         # self.make_move(self.move_log[-1])
@@ -254,630 +288,26 @@ class ChessBoard(tk.Tk):
                 if "piece" in tags:
                     return item
         return None
-    def get_board(self):
-        return (copy.deepcopy(self.current_board),self.blackCastled, self.whiteCastled)
-    def get_all_impact(self, board):
-        impactPos = ([],[]) #[0] is for black, [1] is for white (not racist)
-        for i in range(8):
-            for j in range(8):
-                if board[i][j].find("black_pawn") == 0:
-                    if i + 1 < 8 and board[i+1][j] == "":
-                        impactPos[0].append((i+1,j))
-                        if i == 1 and i + 2 < 8 and board[i+2][j] == "":
-                            impactPos[0].append((i+2,j))
-                    if i + 1 < 8 and j + 1 < 8 and board[i+1][j+1].find("white") == 0:
-                            impactPos[0].append((i+1,j+1))
-                    if i + 1 < 8 and j - 1 >= 0 and board[i+1][j-1].find("white") == 0:
-                            impactPos[0].append((i+1,j-1))
-                        
-
-                elif board[i][j].find("black_rook") == 0:
-                    k = 1
-                    while j + k < 8:
-                        if board[i][j+k] == "":
-                            impactPos[0].append((i,j + k))
-                        else:
-                            if board[i][j+k].find("white")==0:
-                                impactPos[0].append((i,j + k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if board[i+k][j] == "":
-                            impactPos[0].append((i+k,j))
-                        else:
-                            if board[i+k][j].find("white")==0:
-                                impactPos[0].append((i+k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if board[i-k][j] == "":
-                            impactPos[0].append((i-k,j))
-                        else:
-                            if board[i-k][j].find("white")==0:
-                                impactPos[0].append((i-k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if board[i][j-k] == "":
-                            impactPos[0].append((i,j-k))
-                        else:
-                            if board[i][j-k].find("white")==0:
-                                impactPos[0].append((i,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("black_knight") == 0:
-                    moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-                    moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-                    for m in moves:
-                        if board[i + m[0]][j + m[1]] == "" or board[i + m[0]][j + m[1]].find("white")==0:
-                            impactPos[0].append((i+m[0],j+m[1]))
-                elif board[i][j].find("black_bishop") == 0:
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if board[i+k][j+k] == "":
-                            impactPos[0].append((i+k,j+k))
-                        else:
-                            if board[i+k][j+k].find("white")==0:
-                                impactPos[0].append((i+k,j+k))
-                            break
-                        k+=1
-
-                    k = 1
-                    while i - k >= 0  and j + k <8:
-                        if board[i-k][j+k] == "":
-                            impactPos[0].append((i-k,j+k))
-                        else:
-                            if board[i-k][j+k].find("white")==0:
-                                impactPos[0].append((i-k,j+k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >=0 :
-                        if board[i+k][j-k] == "":
-                            impactPos[0].append((i+k,j-k))
-                        else:
-                            if board[i+k][j-k].find("white")==0:
-                                impactPos[0].append((i+k,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j - k >=0:
-                        if board[i-k][j-k] == "":
-                            impactPos[0].append((i-k,j-k))
-                        else:
-                            if board[i-k][j-k].find("white")==0:
-                                impactPos[0].append((i-k,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("black_queen") == 0:
-                    k = 1
-                    while j + k < 8:
-                        if board[i][j+k] == "":
-                            impactPos[0].append((i,j + k))
-                        else:
-                            if board[i][j+k].find("white")==0:
-                                impactPos[0].append((i,j + k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if board[i+k][j] == "":
-                            impactPos[0].append((i+k,j))
-                        else:
-                            if board[i+k][j].find("white")==0:
-                                impactPos[0].append((i+k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if board[i-k][j] == "":
-                            impactPos[0].append((i-k,j))
-                        else:
-                            if board[i-k][j].find("white")==0:
-                                impactPos[0].append((i-k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if board[i][j-k] == "":
-                            impactPos[0].append((i,j-k))
-                        else:
-                            if board[i][j-k].find("white")==0:
-                                impactPos[0].append((i,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if board[i+k][j+k] == "":
-                            impactPos[0].append((i+k,j+k))
-                        else:
-                            if board[i+k][j+k].find("white")==0:
-                                impactPos[0].append((i+k,j+k))
-                            break
-                        k+=1
-
-                    k = 1
-                    while i - k >= 0  and j + k <8:
-                        if board[i-k][j+k] == "":
-                            impactPos[0].append((i-k,j+k))
-                        else:
-                            if board[i-k][j+k].find("white")==0:
-                                impactPos[0].append((i-k,j+k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >=0 :
-                        if board[i+k][j-k] == "":
-                            impactPos[0].append((i+k,j-k))
-                        else:
-                            if board[i+k][j-k].find("white")==0:
-                                impactPos[0].append((i+k,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j - k >=0:
-                        if board[i-k][j-k] == "":
-                            impactPos[0].append((i-k,j-k))
-                        else:
-                            if board[i-k][j-k].find("white")==0:
-                                impactPos[0].append((i-k,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("black_king") == 0:
-                    moves = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)]
-                    # moves = list(filter(lambda x: (originalPos[0] + x[0] in list(range(0,8)))  and (originalPos[1] + x[1] in list(range(0,8))) ))
-                    moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-                    for m in moves:
-                        if board[i + m[0]][j + m[1]] == "" or board[i + m[0]][j + m[1]].find("white")==0:
-                            impactPos[0].append((i+m[0],j+m[1]))
-                elif board[i][j].find("white_pawn") == 0:
-                    if i - 1 >= 0 and board[i-1][j] == "":
-                        impactPos[1].append((i-1,j))
-                        if i == 6 and i - 2 >=0 and board[i-2][j] == "":
-                            impactPos[1].append((i-2,j))
-                    if i - 1 >= 0 and j + 1 < 8 and board[i-1][j+1].find("black") == 0:
-                            impactPos[1].append((i-1,j+1))
-                    if i - 1 >= 0 and j - 1 >= 0 and board[i-1][j-1].find("black") == 0:
-                            impactPos[1].append((i-1,j-1))
-                elif board[i][j].find("white_rook") == 0:
-                    k = 1
-                    while j + k < 8:
-                        if board[i][j+k] == "":
-                            impactPos[1].append((i,j + k))
-                        else:
-                            if board[i][j+k].find("black")==0:
-                                impactPos[1].append((i,j + k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if board[i+k][j] == "":
-                            impactPos[1].append((i+k,j))
-                        else:
-                            if board[i+k][j].find("black")==0:
-                                impactPos[1].append((i+k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if board[i-k][j] == "":
-                            impactPos[1].append((i-k,j))
-                        else:
-                            if board[i-k][j].find("black")==0:
-                                impactPos[1].append((i-k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if board[i][j-k] == "":
-                            impactPos[1].append((i,j-k))
-                        else:
-                            if board[i][j-k].find("black")==0:
-                                impactPos[1].append((i,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("white_knight") == 0:
-                    moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-                    moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-                    for m in moves:
-                        if board[i + m[0]][j + m[1]] == "" or board[i + m[0]][j + m[1]].find("black")==0:
-                            impactPos[1].append((i+m[0],j+m[1]))
-                elif board[i][j].find("white_bishop") == 0:
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if board[i+k][j+k] == "":
-                            impactPos[1].append((i+k,j+k))
-                        else:
-                            if board[i+k][j+k].find("black")==0:
-                                impactPos[1].append((i+k,j+k))
-                            break
-                        k+=1
-
-                    k = 1
-                    while i - k >= 0  and j + k <8:
-                        if board[i-k][j+k] == "":
-                            impactPos[1].append((i-k,j+k))
-                        else:
-                            if board[i-k][j+k].find("black")==0:
-                                impactPos[1].append((i-k,j+k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >=0 :
-                        if board[i+k][j-k] == "":
-                            impactPos[1].append((i+k,j-k))
-                        else:
-                            if board[i+k][j-k].find("black")==0:
-                                impactPos[1].append((i+k,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j - k >=0:
-                        if board[i-k][j-k] == "":
-                            impactPos[1].append((i-k,j-k))
-                        else:
-                            if board[i-k][j-k].find("black")==0:
-                                impactPos[1].append((i-k,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("white_queen") == 0:
-                    k = 1
-                    while j + k < 8:
-                        if board[i][j+k] == "":
-                            impactPos[1].append((i,j + k))
-                        else:
-                            if board[i][j+k].find("black")==0:
-                                impactPos[1].append((i,j + k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if board[i+k][j] == "":
-                            impactPos[1].append((i+k,j))
-                        else:
-                            if board[i+k][j].find("black")==0:
-                                impactPos[1].append((i+k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if board[i-k][j] == "":
-                            impactPos[1].append((i-k,j))
-                        else:
-                            if board[i-k][j].find("black")==0:
-                                impactPos[1].append((i-k,j))
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if board[i][j-k] == "":
-                            impactPos[1].append((i,j-k))
-                        else:
-                            if board[i][j-k].find("black")==0:
-                                impactPos[1].append((i,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if board[i+k][j+k] == "":
-                            impactPos[1].append((i+k,j+k))
-                        else:
-                            if board[i+k][j+k].find("black")==0:
-                                impactPos[1].append((i+k,j+k))
-                            break
-                        k+=1
-
-                    k = 1
-                    while i - k >= 0  and j + k <8:
-                        if board[i-k][j+k] == "":
-                            impactPos[1].append((i-k,j+k))
-                        else:
-                            if board[i-k][j+k].find("black")==0:
-                                impactPos[1].append((i-k,j+k))
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >=0 :
-                        if board[i+k][j-k] == "":
-                            impactPos[1].append((i+k,j-k))
-                        else:
-                            if board[i+k][j-k].find("black")==0:
-                                impactPos[1].append((i+k,j-k))
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j - k >=0:
-                        if board[i-k][j-k] == "":
-                            impactPos[1].append((i-k,j-k))
-                        else:
-                            if board[i-k][j-k].find("black")==0:
-                                impactPos[1].append((i-k,j-k))
-                            break
-                        k+=1
-                elif board[i][j].find("white_king") == 0:
-                    moves = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)]
-                    # moves = list(filter(lambda x: (originalPos[0] + x[0] in list(range(0,8)))  and (originalPos[1] + x[1] in list(range(0,8))) ))
-                    moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-                    for m in moves:
-                        if board[i + m[0]][j + m[1]] == "" or board[i + m[0]][j + m[1]].find("black")==0:
-                            impactPos[1].append((i+m[0],j+m[1]))
-        return impactPos
-
-    def get_all_possible_moves(self,player: str = ['white', 'black']):
-        impactPos = self.get_all_impact(copy.deepcopy(self.current_board)) #[0] is for black, [1] is for white (not racist)
-        movesList = []
-        kingPos = (-1,-1)
-        for i in range(8):
-            for j in range(8):
-                if self.current_board[i][j].find("pawn") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    direction = (1,0)
-                    doubleDirection = (2,0)
-                    attackDirections = [(1,1), (1,-1)]
-                    promoteList = ['rook', 'knight', 'bishop', 'queen']
-                    mList = []
-                    if player == 'black':
-                        if (i+direction[0],j+direction[1]) in impactPos[0] and self.current_board[i+direction[0]][j+direction[1]]=="":
-                            mList.append(Move((i,j),(i+direction[0],j+direction[1]),self.current_board[i][j]))
-                            if (i+direction[0]*2,j+direction[1]) in impactPos[0] and self.current_board[i+direction[0]*2][j+direction[1]]=="" and i==1:
-                                mList.append(Move((i,j),(i+direction[0]*2,j+direction[1]),self.current_board[i][j]))
-                        for dir in attackDirections:
-                            if (i+dir[0],j+dir[1]) in impactPos[0] and self.current_board[i+dir[0]][j+dir[1]].find("white")>=0:
-                                mList.append(Move((i,j),(i+dir[0],j+dir[1]),self.current_board[i][j]))
-                        for m in mList:
-                            if m.new_pos[0] == 7:
-                                
-                                for pr in promoteList:
-                                    movesList.append(Move(m.position,m.new_pos,m.unit_type,special_move="promote",promoted = m.unit_type.replace("pawn",pr)))
-                            else:
-                                movesList.append(m)
-        
-
-                        
-                    elif player == 'white':
-                        if (i-direction[0],j-direction[1]) in impactPos[1] and self.current_board[i-direction[0]][j-direction[1]]=="":
-                            mList.append(Move((i,j),(i-direction[0],j-direction[1]),self.current_board[i][j]))
-                            if (i-direction[0]*2,j-direction[1]) in impactPos[1] and self.current_board[i-direction[0]*2][j-direction[1]]=="" and i==6:
-                                mList.append(Move((i,j),(i-direction[0]*2,j-direction[1]),self.current_board[i][j]))
-                        for dir in attackDirections:
-                            if (i-dir[0],j-dir[1]) in impactPos[1] and self.current_board[i-dir[0]][j-dir[1]].find("black")>=0:
-                                mList.append(Move((i,j),(i-dir[0],j-dir[1]),self.current_board[i][j]))
-                        for m in mList:
-                            if m.new_pos[0] == 0:
-                                
-                                for pr in promoteList:
-                                    movesList.append(Move(m.position,m.new_pos,m.unit_type,special_move="promote",promoted = m.unit_type.replace("pawn",pr)))
-                            else:
-                                movesList.append(m)
-                elif self.current_board[i][j].find("rook") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    side = 0
-                    if player == "white":
-                        side = 1
-                    k = 1
-                    while j + k < 8:
-                        if (i,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i,j+k),self.current_board[i][j]))
-                            if self.current_board[i][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if (i,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i,j-k),self.current_board[i][j]))
-                            if self.current_board[i][j-k] != "":
-                                break 
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if (i+k,j) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j),self.current_board[i][j]))
-                            if self.current_board[i+k][j] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if (i - k,j) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j),self.current_board[i][j]))
-                            if self.current_board[i-k][j] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    
-                    #castling (not completed)
-                    if not self.current_board[i][j].endswith("_"):
-                        #finding king
-                        kingInd = -1
-                        for k in range(8):
-                            if self.current_board[i][k].find(player+"_king")>=0:
-                                kingInd = k
-                        if k>=0 and not self.current_board[i][kingInd].endswith("_"):
-                            if not (i,kingInd) in impactPos[abs(side-1)]:
-                                pass
-
-                         
-                elif self.current_board[i][j].find("knight") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    side = 0
-                    if player == "white":
-                        side = 1
-                    moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-                    for m in moves:
-                        if (i + m[0], j + m[1]) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+m[0],j+m[1]),self.current_board[i][j]))
-
-
+    # Other threads never touch the window directly: they post calls, which run here on the Tk thread
+    def post(self, callback, *args):
+        self.ui_calls.put((callback, args))
+
+    def _run_ui_calls(self):
+        while True:
+            try:
+                callback, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        self.after(UI_POLL_MS, self._run_ui_calls)
+
+    def show_move(self, move: Move):
+        self.make_move(move)
+        self.boardDisplay()
+
+    def show_turn(self, player: str = ['white', 'black']):
+        self.current_player = player
 
-                elif self.current_board[i][j].find("bishop") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    side = 0
-                    if player == "white":
-                        side = 1
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if (i+k,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j+k),self.current_board[i][j]))
-                            if self.current_board[i+k][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j + k <8:
-                        if (i-k,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j+k),self.current_board[i][j]))
-                            if self.current_board[i-k][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >= 0:
-                        if (i+k,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j-k),self.current_board[i][j]))
-                            if self.current_board[i+k][j-k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >=0 and j - k >= 0:
-                        if (i-k,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j-k),self.current_board[i][j]))
-                            if self.current_board[i-k][j-k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    
-                elif self.current_board[i][j].find("queen") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    side = 0
-                    if player == "white":
-                        side = 1
-                    k = 1
-                    while j + k < 8:
-                        if (i,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i,j+k),self.current_board[i][j]))
-                            if self.current_board[i][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while j - k >= 0:
-                        if (i,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i,j-k),self.current_board[i][j]))
-                            if self.current_board[i][j-k] != "":
-                                break 
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8:
-                        if (i+k,j) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j),self.current_board[i][j]))
-                            if self.current_board[i+k][j] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0:
-                        if (i - k,j) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j),self.current_board[i][j]))
-                            if self.current_board[i-k][j] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j + k <8:
-                        if (i+k,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j+k),self.current_board[i][j]))
-                            if self.current_board[i+k][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >= 0 and j + k <8:
-                        if (i-k,j+k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j+k),self.current_board[i][j]))
-                            if self.current_board[i-k][j+k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i + k < 8 and j - k >= 0:
-                        if (i+k,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+k,j-k),self.current_board[i][j]))
-                            if self.current_board[i+k][j-k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                    k = 1
-                    while i - k >=0 and j - k >= 0:
-                        if (i-k,j-k) in impactPos[side]:
-                            movesList.append(Move((i,j),(i-k,j-k),self.current_board[i][j]))
-                            if self.current_board[i-k][j-k] != "":
-                                break
-                        else:
-                            break
-                        k+=1
-                elif self.current_board[i][j].find("king") >= 0 and self.current_board[i][j].find(player) >= 0:
-                    kingPos = (i,j)
-                    side = 0
-                    if player == "white":
-                        side = 1
-                    moves = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)]
-                    for m in moves:
-                        if (i + m[0], j + m[1]) in impactPos[side]:
-                            movesList.append(Move((i,j),(i+m[0],j+m[1]),self.current_board[i][j]))
-        side = 0
-        if player == "white":
-            side = 1
-        #print(kingPos)
-        #print(impactPos[1])
-        if True:
-            legalList = []
-
-            for mv in movesList:
-                temp_board = copy.deepcopy(self.current_board)
-                unit = temp_board[mv.position[0]][mv.position[1]]
-                temp_board[mv.position[0]][mv.position[1]] = ""
-                temp_board[mv.new_pos[0]][mv.new_pos[1]] = unit
-                #print(temp_board)
-
-                if mv.special_move == "promote":
-                    temp_board[mv.new_pos[0]][mv.new_pos[1]] = mv.promoted
-                newImpact = self.get_all_impact(copy.deepcopy(temp_board))
-                
-                #print(mv, mv.new_pos in newImpact[(side + 1)%2])
-
-                #print(newImpact)
-                if mv.unit_type.find("_king")>0:
-                    #print(mv, mv.new_pos in newImpact[(side + 1)%2])
-                    #print(temp_board[7][2])
-                    #print(newImpact)
-                    if mv.new_pos in newImpact[(side + 1)%2]:
-                        continue
-                else:
-
-                    if kingPos in newImpact[(side + 1)%2]:
-                        continue
-                legalList.append(mv)
-
-            return legalList
-        else:
-            return movesList
     def boardDisplay(self):
         square_size = 64
 
@@ -897,377 +327,6 @@ class ChessBoard(tk.Tk):
                 
             self.canvas.create_rectangle(x1, y1, x2, y2, fill="yellow")
             self.draw_pieces()
-    def make_move(self,move: Move):
-        self.last_move = move
-        self.previous_board.insert(0,copy.deepcopy(self.current_board))
-        unit = self.current_board[move.position[0]][move.position[1]]
-        self.current_board[move.position[0]][move.position[1]] = ""
-        self.current_board[move.new_pos[0]][move.new_pos[1]] = unit
-        if move.special_move == "promote":
-            self.current_board[move.new_pos[0]][move.new_pos[1]] = move.promoted
-        
-    def undo_move(self):
-        if len(self.previous_board)==0:
-            return
-        self.current_board = copy.deepcopy(self.previous_board[0])
-        self.previous_board.pop(0)
-    
-    def impact_pos(self,unitType,pos):
-        impactPos = [] 
-        i,j = pos
-        tempboard = copy.deepcopy(self.current_board)
-        if unitType == "black_pawn":
-            if i + 1 < 8 and tempboard[i+1][j] == "":
-                impactPos.append((i+1,j))
-                if i == 1 and i + 2 < 8 and tempboard[i+2][j] == "":
-                    impactPos.append((i+2,j))
-            if i + 1 < 8 and j + 1 < 8 and tempboard[i+1][j+1].find("white") == 0:
-                    impactPos.append((i+1,j+1))
-            if i + 1 < 8 and j - 1 >= 0 and tempboard[i+1][j-1].find("white") == 0:
-                    impactPos.append((i+1,j-1))
-        elif unitType == "black_rook":
-            k = 1
-            while j + k < 8:
-                if tempboard[i][j+k] == "":
-                    impactPos.append((i,j + k))
-                else:
-                    if tempboard[i][j+k].find("white")==0:
-                        impactPos.append((i,j + k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8:
-                if tempboard[i+k][j] == "":
-                    impactPos.append((i+k,j))
-                else:
-                    if tempboard[i+k][j].find("white")==0:
-                        impactPos.append((i+k,j))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0:
-                if tempboard[i-k][j] == "":
-                    impactPos.append((i-k,j))
-                else:
-                    if tempboard[i-k][j].find("white")==0:
-                        impactPos.append((i-k,j))
-                    break
-                k+=1
-            k = 1
-            while j - k >= 0:
-                if tempboard[i][j-k] == "":
-                    impactPos.append((i,j-k))
-                else:
-                    if tempboard[i][j-k].find("white")==0:
-                        impactPos.append((i,j-k))
-                    break
-                k+=1
-        
-        elif unitType == "black_knight":
-            moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-            moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-            for m in moves:
-                if tempboard[i + m[0]][j + m[1]] == "" or tempboard[i + m[0]][j + m[1]].find("white")==0:
-                    impactPos.append((i+m[0],j+m[1]))
-
-        elif unitType == "black_bishop":
-            k = 1
-            while i + k < 8 and j + k <8:
-                if tempboard[i+k][j+k] == "":
-                    impactPos.append((i+k,j+k))
-                else:
-                    if tempboard[i+k][j+k].find("white")==0:
-                        impactPos.append((i+k,j+k))
-                    break
-                k+=1
-
-            k = 1
-            while i - k >= 0  and j + k <8:
-                if tempboard[i-k][j+k] == "":
-                    impactPos.append((i-k,j+k))
-                else:
-                    if tempboard[i-k][j+k].find("white")==0:
-                        impactPos.append((i-k,j+k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j - k >=0 :
-                if tempboard[i+k][j-k] == "":
-                    impactPos.append((i+k,j-k))
-                else:
-                    if tempboard[i+k][j-k].find("white")==0:
-                        impactPos.append((i+k,j-k))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0 and j - k >=0:
-                if tempboard[i-k][j-k] == "":
-                    impactPos.append((i-k,j-k))
-                else:
-                    if tempboard[i-k][j-k].find("white")==0:
-                        impactPos.append((i-k,j-k))
-                    break
-                k+=1    
-        elif unitType == "black_queen":
-            k = 1
-            while j + k < 8:
-                if tempboard[i][j+k] == "":
-                    impactPos.append((i,j + k))
-                else:
-                    if tempboard[i][j+k].find("white")==0:
-                        impactPos.append((i,j + k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8:
-                if tempboard[i+k][j] == "":
-                    impactPos.append((i+k,j))
-                else:
-                    if tempboard[i+k][j].find("white")==0:
-                        impactPos.append((i+k,j))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0:
-                if tempboard[i-k][j] == "":
-                    impactPos.append((i-k,j))
-                else:
-                    if tempboard[i-k][j].find("white")==0:
-                        impactPos.append((i-k,j))
-                    break
-                k+=1
-            k = 1
-            while j - k >= 0:
-                if tempboard[i][j-k] == "":
-                    impactPos.append((i,j-k))
-                else:
-                    if tempboard[i][j-k].find("white")==0:
-                        impactPos.append((i,j-k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j + k <8:
-                if tempboard[i+k][j+k] == "":
-                    impactPos.append((i+k,j+k))
-                else:
-                    if tempboard[i+k][j+k].find("white")==0:
-                        impactPos.append((i+k,j+k))
-                    break
-                k+=1
-
-            k = 1
-            while i - k >= 0  and j + k <8:
-                if tempboard[i-k][j+k] == "":
-                    impactPos.append((i-k,j+k))
-                else:
-                    if tempboard[i-k][j+k].find("white")==0:
-                        impactPos.append((i-k,j+k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j - k >=0 :
-                if tempboard[i+k][j-k] == "":
-                    impactPos.append((i+k,j-k))
-                else:
-                    if tempboard[i+k][j-k].find("white")==0:
-                        impactPos.append((i+k,j-k))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0 and j - k >=0:
-                if tempboard[i-k][j-k] == "":
-                    impactPos.append((i-k,j-k))
-                else:
-                    if tempboard[i-k][j-k].find("white")==0:
-                        impactPos.append((i-k,j-k))
-                    break
-                k+=1
-        elif unitType == "black_king":
-            moves = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)]
-            # moves = list(filter(lambda x: (originalPos[0] + x[0] in list(range(0,8)))  and (originalPos[1] + x[1] in list(range(0,8))) ))
-            moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-            for m in moves:
-                if tempboard[i + m[0]][j + m[1]] == "" or tempboard[i + m[0]][j + m[1]].find("white")==0:
-                    impactPos.append((i+m[0],j+m[1]))
-                    
-        elif unitType =="white_pawn":
-            if i - 1 >= 0 and tempboard[i-1][j] == "":
-                impactPos.append((i-1,j))
-                if i == 6 and i - 2 >=0 and tempboard[i-2][j] == "":
-                    impactPos.append((i-2,j))
-            if i - 1 >= 0 and j + 1 < 8 and tempboard[i-1][j+1].find("black") == 0:
-                    impactPos.append((i-1,j+1))
-            if i - 1 >= 0 and j - 1 >= 0 and tempboard[i-1][j-1].find("black") == 0:
-                    impactPos.append((i-1,j-1))   
-        elif unitType == "white_rook":
-            k = 1
-            while j + k < 8:
-                if tempboard[i][j+k] == "":
-                    impactPos.append((i,j + k))
-                else:
-                    if tempboard[i][j+k].find("black")==0:
-                        impactPos.append((i,j + k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8:
-                if tempboard[i+k][j] == "":
-                    impactPos.append((i+k,j))
-                else:
-                    if tempboard[i+k][j].find("black")==0:
-                        impactPos.append((i+k,j))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0:
-                if tempboard[i-k][j] == "":
-                    impactPos.append((i-k,j))
-                else:
-                    if tempboard[i-k][j].find("black")==0:
-                        impactPos.append((i-k,j))
-                    break
-                k+=1
-            k = 1
-            while j - k >= 0:
-                if tempboard[i][j-k] == "":
-                    impactPos.append((i,j-k))
-                else:
-                    if tempboard[i][j-k].find("black")==0:
-                        impactPos.append((i,j-k))
-                    break
-                k+=1   
-        elif unitType =="white_knight":
-            moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-            moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-            for m in moves:
-                if tempboard[i + m[0]][j + m[1]] == "" or tempboard[i + m[0]][j + m[1]].find("black")==0:
-                    impactPos.append((i+m[0],j+m[1]))    
-
-        elif unitType == "white_bishop":
-            k = 1
-            while i + k < 8 and j + k <8:
-                if tempboard[i+k][j+k] == "":
-                    impactPos.append((i+k,j+k))
-                else:
-                    if tempboard[i+k][j+k].find("black")==0:
-                        impactPos.append((i+k,j+k))
-                    break
-                k+=1
-
-            k = 1
-            while i - k >= 0  and j + k <8:
-                if tempboard[i-k][j+k] == "":
-                    impactPos.append((i-k,j+k))
-                else:
-                    if tempboard[i-k][j+k].find("black")==0:
-                        impactPos.append((i-k,j+k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j - k >=0 :
-                if tempboard[i+k][j-k] == "":
-                    impactPos.append((i+k,j-k))
-                else:
-                    if tempboard[i+k][j-k].find("black")==0:
-                        impactPos.append((i+k,j-k))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0 and j - k >=0:
-                if tempboard[i-k][j-k] == "":
-                    impactPos.append((i-k,j-k))
-                else:
-                    if tempboard[i-k][j-k].find("black")==0:
-                        impactPos.append((i-k,j-k))
-                    break
-                k+=1
-
-            
-        elif unitType == "white_queen":
-            k = 1
-            while j + k < 8:
-                if tempboard[i][j+k] == "":
-                    impactPos.append((i,j + k))
-                else:
-                    if tempboard[i][j+k].find("black")==0:
-                        impactPos.append((i,j + k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8:
-                if tempboard[i+k][j] == "":
-                    impactPos.append((i+k,j))
-                else:
-                    if tempboard[i+k][j].find("black")==0:
-                        impactPos.append((i+k,j))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0:
-                if tempboard[i-k][j] == "":
-                    impactPos.append((i-k,j))
-                else:
-                    if tempboard[i-k][j].find("black")==0:
-                        impactPos.append((i-k,j))
-                    break
-                k+=1
-            k = 1
-            while j - k >= 0:
-                if tempboard[i][j-k] == "":
-                    impactPos.append((i,j-k))
-                else:
-                    if tempboard[i][j-k].find("black")==0:
-                        impactPos.append((i,j-k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j + k <8:
-                if tempboard[i+k][j+k] == "":
-                    impactPos.append((i+k,j+k))
-                else:
-                    if tempboard[i+k][j+k].find("black")==0:
-                        impactPos.append((i+k,j+k))
-                    break
-                k+=1
-
-            k = 1
-            while i - k >= 0  and j + k <8:
-                if tempboard[i-k][j+k] == "":
-                    impactPos.append((i-k,j+k))
-                else:
-                    if tempboard[i-k][j+k].find("black")==0:
-                        impactPos.append((i-k,j+k))
-                    break
-                k+=1
-            k = 1
-            while i + k < 8 and j - k >=0 :
-                if tempboard[i+k][j-k] == "":
-                    impactPos.append((i+k,j-k))
-                else:
-                    if tempboard[i+k][j-k].find("black")==0:
-                        impactPos.append((i+k,j-k))
-                    break
-                k+=1
-            k = 1
-            while i - k >= 0 and j - k >=0:
-                if tempboard[i-k][j-k] == "":
-                    impactPos.append((i-k,j-k))
-                else:
-                    if tempboard[i-k][j-k].find("black")==0:
-                        impactPos.append((i-k,j-k))
-                    break
-                k+=1   
-
-        elif unitType =="white_king":
-            moves = [(1,0), (-1,0), (0,1), (0,-1), (1,1), (-1,-1), (1,-1), (-1,1)]
-            # moves = list(filter(lambda x: (originalPos[0] + x[0] in list(range(0,8)))  and (originalPos[1] + x[1] in list(range(0,8))) ))
-            moves = list(filter(lambda x: i + x[0] in list(range(0,8))  and j + x[1] in list(range(0,8)),moves))
-            for m in moves:
-                if tempboard[i + m[0]][j + m[1]] == "" or tempboard[i + m[0]][j + m[1]].find("black")==0:
-                    impactPos.append((i+m[0],j+m[1]))    
-                    
-        return impactPos
-        
     def read_move(self,move:Move):
       # position, newPos, unitType, special_move = "", promoted = "" 
         
@@ -1288,8 +347,6 @@ class ChessBoard(tk.Tk):
             print("error")
             return
         else:
-            self.previous_board.insert(0,copy.deepcopy(self.current_board))
-
             a,b = oldPosX,oldPosY
             x,y = newPosX,newPosY
             r = int((b)//self.size)
@@ -1323,332 +380,7 @@ class ChessBoard(tk.Tk):
             self.move_log.append(Move((r,c),(row,col),tags[0]))
             #for ele in self.move_log:
             #    print(ele)
-            self.previous_board.insert(0,copy.deepcopy(self.current_board))
-            self.current_board[self.move_log[-1].position[0]][self.move_log[-1].position[1]] = ""
-            self.current_board[self.move_log[-1].new_pos[0]][self.move_log[-1].new_pos[1]] = move.unit_type
-            if self.move_log[-1].special_move == "promote":
-                self.current_board[self.move_log[-1].new_pos[0]][self.move_log[-1].new_pos[1]] = self.move_log[-1].promoted
-    def isCheck(self, board=None, player:str =['white','black'], ):
-        
-        # player nguoi 
-
-        tempboard = copy.deepcopy(board) if board else copy.deepcopy(self.current_board)
-        originalPos = None
-        for i in range(8):
-            for j in range(8):
-                if tempboard[i][j].find("king") >= 0 and tempboard[i][j].find(player) >= 0:
-                    originalPos=[i,j]
-        if player == "black":
-            i = 1
-            #check diag
-            flag =False
-            while originalPos[0] - i > 0 and originalPos[1] - i > 0 and not flag:
-                if  tempboard[originalPos[0]-i][originalPos[1]-i] == "white_king" and i==1:
-                    flag= True
-                    break
-                
-                if tempboard[originalPos[0]-i][originalPos[1]-i]  not in ["white_queen","white_bishop",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]-i][originalPos[1]-i] == "white_queen" or tempboard[originalPos[0]-i][originalPos[1]-i] == "white_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            
-            while originalPos[0] - i > 0 and originalPos[1] + i < 8 and not flag:
-                if tempboard[originalPos[0]-i][originalPos[1]+i] == "white_king" and i==1:
-                    flag= True
-                    break
-                
-                if tempboard[originalPos[0]-i][originalPos[1]+i]  not in ["white_queen","white_bishop",""]:
-                    flag =False
-                    break
-
-                if tempboard[originalPos[0]-i][originalPos[1]+i] == "white_queen" or tempboard[originalPos[0]-i][originalPos[1]+i] == "white_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-
-            while originalPos[0] + i < 8 and originalPos[1] - i > 0 and not flag:
-                if (tempboard[originalPos[0]+i][originalPos[1]-i] == "white_pawn" or tempboard[originalPos[0]+i][originalPos[1]-i] == "white_king") and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]-i]  not in ["white_queen","white_bishop",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]-i] == "white_queen" or tempboard[originalPos[0]+i][originalPos[1]-i] == "white_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-
-            while originalPos[0] + i < 8 and originalPos[1] + i <8 and not flag:
-                if (tempboard[originalPos[0]+i][originalPos[1]+i] == "white_pawn" or tempboard[originalPos[0]+i][originalPos[1]+i] == "white_king") and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]+i]  not in ["white_queen","white_bishop",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]+i] == "white_queen" or tempboard[originalPos[0]+i][originalPos[1]+i] == "white_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            # check cross:
-            while originalPos[1] + i <8 and not flag:
-                if tempboard[originalPos[0]][originalPos[1]+i] == "white_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]][originalPos[1]+i]  not in ["white_queen","white_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]][originalPos[1]+i] == "white_queen" or tempboard[originalPos[0]][originalPos[1]+i] == "white_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            while originalPos[0] + i <8 and not flag:
-                if tempboard[originalPos[0]+i][originalPos[1]] == "white_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]]  not in ["white_queen","white_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]] == "white_queen" or tempboard[originalPos[0]+i][originalPos[1]] == "white_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            while originalPos[1] - i >8 and not flag:
-                if tempboard[originalPos[0]][originalPos[1]-i] == "white_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]][originalPos[1]-i]  not in ["white_queen","white_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]][originalPos[1]-i] == "white_queen" or tempboard[originalPos[0]][originalPos[1]-i] == "white_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            while originalPos[0] - i >8 and not flag:
-                if tempboard[originalPos[0]-i][originalPos[1]] == "white_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]-i][originalPos[1]]  not in ["white_queen","white_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]-i][originalPos[1]] == "white_queen" or tempboard[originalPos[0]-i][originalPos[1]] == "white_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            # check knight:
-            if not flag:
-                moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-                for move in moves:
-                    new_row = originalPos[0] + move[0]
-                    new_col = originalPos[1] + move[1]
-                    if 0 <= new_row < 8 and 0 <= new_col < 8:
-                        if tempboard[new_row][new_col] == 'white_knight':
-                            flag =True
-            return flag
-        if player == "white":
-            
-            i = 1
-            #check diag
-            flag =False
-            while originalPos[0] - i > 0 and originalPos[1] - i > 0 and not flag:
-                
-                if (tempboard[originalPos[0]-i][originalPos[1]-i] == "black_pawn" or tempboard[originalPos[0]-i][originalPos[1]-i] == "black_king") and i==1:
-                    flag= True
-                    break
-                
-                if tempboard[originalPos[0]-i][originalPos[1]-i]  not in ["black_queen","black_bishop",""]:
-                    
-                    flag =False
-                    break
-                
-                if tempboard[originalPos[0]-i][originalPos[1]-i] == "black_queen" or tempboard[originalPos[0]-i][originalPos[1]-i] == "black_bishop":
-                    
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            
-            while originalPos[0] - i > 0 and originalPos[1] + i < 8 and not flag:
-                
-                if (tempboard[originalPos[0]-i][originalPos[1]+i] == "black_pawn" or tempboard[originalPos[0]-i][originalPos[1]+i] == "black_king") and i==1:
-                    flag= True
-                    break
-                
-                if tempboard[originalPos[0]-i][originalPos[1]+i]  not in ["black_queen","black_bishop",""]:
-                    flag =False
-                    break
-
-                if tempboard[originalPos[0]-i][originalPos[1]+i] == "black_queen" or tempboard[originalPos[0]-i][originalPos[1]+i] == "black_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            
-            while originalPos[0] + i < 8 and originalPos[1] - i > 0 and not flag:
-                
-                if  tempboard[originalPos[0]+i][originalPos[1]-i] == "black_king" and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]-i]  not in ["black_queen","black_bishop",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]-i] == "black_queen" or tempboard[originalPos[0]+i][originalPos[1]-i] == "black_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-
-            while originalPos[0] + i < 8 and originalPos[1] + i <8 and not flag:
-                
-                if tempboard[originalPos[0]+i][originalPos[1]+i] == "black_king" and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]+i]  not in ["black_queen","black_bishop",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]+i] == "black_queen" or tempboard[originalPos[0]+i][originalPos[1]+i] == "black_bishop":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            # check cross:
-            while originalPos[1] + i <8 and not flag:
-                
-                if tempboard[originalPos[0]][originalPos[1]+i] == "black_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]][originalPos[1]+i]  not in ["black_queen","black_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]][originalPos[1]+i] == "black_queen" or tempboard[originalPos[0]][originalPos[1]+i] == "black_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            while originalPos[0] + i <8 and not flag:
-                
-                if tempboard[originalPos[0]+i][originalPos[1]] == "black_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]]  not in ["black_queen","black_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]+i][originalPos[1]] == "black_queen" or tempboard[originalPos[0]+i][originalPos[1]] == "black_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            
-            while originalPos[1] - i >0 and not flag:
-                
-                if tempboard[originalPos[0]][originalPos[1]-i] == "black_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]][originalPos[1]-i]  not in ["black_queen","black_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]][originalPos[1]-i] == "black_queen" or tempboard[originalPos[0]][originalPos[1]-i] == "black_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            while originalPos[0] - i >0 and not flag:
-                
-                if tempboard[originalPos[0]-i][originalPos[1]] == "black_king"  and i==1:
-                    flag= True
-                    break
-                if tempboard[originalPos[0]-i][originalPos[1]]  not in ["black_queen","black_rook",""]:
-                    flag =False
-                    break
-                if tempboard[originalPos[0]-i][originalPos[1]] == "black_queen" or tempboard[originalPos[0]-i][originalPos[1]] == "black_rook":
-                    flag= True
-                    break
-                i+=1
-            i = 1
-            # check knight:
-            if not flag:
-                moves = [(-1,-2), (-1,2), (1,-2), (1,2), (-2,-1), (-2,1), (2,-1), (2,1)]
-                for move in moves:
-                    new_row = originalPos[0] + move[0]
-                    new_col = originalPos[1] + move[1]
-                    if 0 <= new_row < 8 and 0 <= new_col < 8:
-                        if tempboard[new_row][new_col] == 'black_knight':
-                            flag =True
-            return flag
-       
-    def isCheckMate(self,player:str=['white','black']):
-        if not self.isCheck(None, player):
-            return False
-        moves = self.get_all_possible_moves(player)
-        #for ele in moves:
-        #    print(ele)
-        board = copy.deepcopy(self.current_board)
-
-        for move in moves:
-            board = copy.deepcopy(self.current_board)
-
-            unit = board[move.position[0]][move.position[1]]
-            #print(unit)
-            board[move.position[0]][move.position[1]] = ""
-            board[move.new_pos[0]][move.new_pos[1]] = unit
-            if move.special_move == "promote":
-                board[move.new_pos[0]][move.new_pos[1]] = move.promoted
-
-            if not self.isCheck(board,player):
-                return False
-        if player == "white":
-            self.is_checkmated = "white"
-        else:
-            self.is_checkmated = "black"
-        return True
-
-
-    def is_draw(self,player: str = ['white', 'black']):
-        if player =="white":
-            res = self.get_all_possible_moves("white")
-            if len(res) == 0 and not self.isCheck(None, player):
-                self.is_stalemated = 'white'
-                return True
-            return False
-        if player == "black":
-            res = self.get_all_possible_moves("black")
-            if len(res) == 0 and not self.isCheck(None, player):
-                self.is_stalemated = 'black'
-                return True
-            return False
-        
-    def is_game_over(self):
-        self.isCheckMate("white")
-        self.isCheckMate("black")
-        self.is_draw("white")
-        self.is_draw("black")
-        
-        if self.is_checkmated:
-            print(f"{self.is_checkmated} is checkmated")
-            return True
-        if self.is_stalemated:
-            print(f"{self.is_stalemated} is stalemated")
-            return True
-        return False
-    
-    def get_winner(self):
-        if self.is_checkmated == "white":
-            return "black"
-        if self.is_checkmated == "black":
-            return "white"
-        if self.is_stalemated:
-            return "draw"
-
+            self.make_move(move)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+from position import Position, COLOR_NAMES, WHITE, BLACK
+from minimax import Minimax
+import multiprocessing
+
+
+def move_from_packed(position, packed, color=None):
+    """The legal move of color (the side to move by default) in position with the given Move.packed
+    value, or None."""
+    if color is None:
+        color = position.side_to_move
+    for move in position.get_all_possible_moves(COLOR_NAMES[color]):
+        if move.packed == packed:
+            return move
+    return None
+
+
+def _engine_main(requests, replies, stop, depth, time_limit, options):
+    """Child process loop: takes ('search' | 'ponder', id, snapshot, is_white) requests until 'quit'.
+    is_white picks the colour to search for like Minimax.get_best_move, None for the side to move.
+
+    A search streams ('progress', id, info) with Minimax's progress dict, the move and pv given as
+    Move.packed values, and every request ends with ('done', id, packed best move or None) once
+    it finishes or stop is set.
+    """
+    minimax = Minimax(depth, Position(), time_limit=time_limit, **options)
+    while True:
+        request = requests.get()
+        if request[0] == 'quit':
+            break
+        kind, search_id, snapshot, is_white = request
+        minimax.board = Position.from_snapshot(snapshot)
+        if kind == 'ponder':
+            minimax.ponder(stop.is_set)
+            replies.put(('done', search_id, None))
+            continue
+        def progress(info):
+            info = dict(info, move=info['move'].packed, pv=[move.packed for move in info['pv']])
+            replies.put(('progress', search_id, info))
+        minimax.on_progress = progress
+        minimax.stop_check = stop.is_set
+        move = minimax.get_best_move(is_white, time_limit=time_limit)
+        minimax.stop_check = None
+        minimax.on_progress = None
+        replies.put(('done', search_id, move.packed if move is not None else None))
+
+
+class EngineProcess():
+    """Minimax running in a child process, so a search never holds the GIL of the GUI process.
+
+    Positions go to the child as Position.snapshot()s over a queue; progress and results come
+    back over another. The child keeps one Minimax, and with it the transposition table, for
+    the whole game. Only one search or ponder runs at a time; cancel() ends it early.
+    """
+    def __init__(self, depth, time_limit=None, **options):
+        # spawned for the same reason as Minimax's worker pool, see Minimax._get_pool
+        context = multiprocessing.get_context('spawn')
+        self.requests = context.Queue()
+        self.replies = context.Queue()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=_engine_main, daemon=True,
+                                       args=(self.requests, self.replies, self.stop_event, depth, time_limit, options))
+        self.process.start()
+        self.search_id = 0
+        self.busy = False
+
+    def _start(self, kind, position, is_white=None):
+        if self.busy:
+            self.cancel()
+        self.search_id += 1
+        self.busy = True
+        self.stop_event.clear()
+        self.requests.put((kind, self.search_id, position.snapshot(), is_white))
+        return self.search_id
+
+    def search(self, position, is_white=None):
+        """Starts searching position for white (is_white True), black (False) or its side to move
+        (None); returns the search id."""
+        return self._start('search', position, is_white)
+
+    def ponder(self, position):
+        """Starts pondering position, the opponent to move, until cancel() or the next search."""
+        return self._start('ponder', position)
+
+    def wait(self, on_progress=None):
+        """Blocks until the running search is done and returns the packed best move (None if there
+        is none). on_progress is called with each progress dict the search reports."""
+        while True:
+            message = self.replies.get()
+            if message[1] != self.search_id:
+                continue
+            if message[0] == 'progress':
+                if on_progress is not None:
+                    on_progress(message[2])
+                continue
+            self.busy = False
+            return message[2]
+
+    def stop(self):
+        """Asks the running search or ponder to end without waiting for it; wait() then returns soon."""
+        self.stop_event.set()
+
+    def cancel(self):
+        """Stops the running search or ponder; returns its best move so far like wait()."""
+        if not self.busy:
+            return None
+        self.stop()
+        return self.wait()
+
+    def close(self):
+        """Cancels any search and ends the child process."""
+        if self.process.is_alive():
+            self.cancel()
+            self.requests.put(('quit',))
+            self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+if __name__ == '__main__':
+    import queue
+    import time
+
+    # the parent stays free while the child searches: count how often it gets to run meanwhile
+    position = Position()
+    engine = EngineProcess(5)
+    engine.search(position)
+    ticks = 0
+    start = time.time()
+    while engine.busy:
+        try:
+            message = engine.replies.get(timeout=0.01)
+        except queue.Empty:
+            ticks += 1
+            continue
+        if message[0] == 'progress':
+            info = message[2]
+            print(f"depth {info['depth']} move {move_from_packed(position, info['move'])} score {info['score']} "
+                  f"nodes {info['nodes']} nps {info['nps']:.0f}")
+        else:
+            engine.busy = False
+            print(f"best move {move_from_packed(position, message[2])} after {time.time() - start:.2f} seconds, "
+                  f"parent ran {ticks} times while waiting")
+    engine.search(position)
+    time.sleep(0.5)
+    print(f"cancelled after 0.5 seconds with {move_from_packed(position, engine.cancel())}")
+    engine.close()
@@ -0,0 +1,78 @@
+import numpy as np
+from position import SQUARES, WHITE, BLACK, PAWN, KING, COLOR_MASK, TOTAL_PHASE, PHASE_WEIGHTS
+
+# The 12 piece codes in table row order: white pawn..king, then black pawn..king
+PIECES = [color | kind for color in (WHITE, BLACK) for kind in range(PAWN, KING + 1)]
+# mailbox index of each of the 64 squares, to cut the playing area out of Position.squares
+MAILBOX = np.array(SQUARES, dtype=np.intp)
+SQUARE_INDEX = np.arange(64)
+PHASE_TABLE = np.array(PHASE_WEIGHTS, dtype=np.int64)
+
+
+def board_array(squares):
+    """The 64 squares of Position.squares as an int8 array of piece codes, 0 for empty."""
+    return np.frombuffer(squares, dtype=np.uint8)[MAILBOX].astype(np.int8)
+
+
+class NumpyEvaluator():
+    """Tapered material plus piece-square evaluation as NumPy gather-and-sums.
+
+    values and endgame_values map each piece code to its 64 middlegame and endgame values
+    (material included, row-major from black's back rank, from the piece's own point of view);
+    endgame_values defaults to values. Each is stacked into a (12, 64) array signed for white,
+    table and endgame_table, and spread over a code table whose row for any piece code is that
+    piece's table row and whose other rows are zero, so a board of piece codes indexes it
+    directly. The two scores are blended by the game phase of the board, see taper().
+    """
+    def __init__(self, values, endgame_values=None):
+        if endgame_values is None:
+            endgame_values = values
+        self.table = self._stack(values)
+        self.endgame_table = self._stack(endgame_values)
+        self.code_table = self._spread(self.table)
+        self.endgame_code_table = self._spread(self.endgame_table)
+
+    @staticmethod
+    def _stack(values):
+        return np.array([values[piece] if piece & WHITE else [-v for v in values[piece]] for piece in PIECES],
+                        dtype=np.float64)
+
+    @staticmethod
+    def _spread(table):
+        code_table = np.zeros((COLOR_MASK + KING + 1, 64))
+        for row, piece in enumerate(PIECES):
+            code_table[piece] = table[row]
+        return code_table
+
+    @staticmethod
+    def _mailbox(code_table):
+        table = [[0.0] * 120 for _ in range(len(code_table))]
+        for piece in PIECES:
+            for bit, sq in enumerate(SQUARES):
+                table[piece][sq] = float(code_table[piece, bit])
+        return table
+
+    def mailbox_tables(self):
+        """The middlegame and endgame code tables as nested lists indexed [piece code][Position.squares
+        index], the layout Position.set_evaluation takes for its incremental scores."""
+        return self._mailbox(self.code_table), self._mailbox(self.endgame_code_table)
+
+    def evaluate(self, squares):
+        """White's score of a Position.squares board."""
+        board = np.frombuffer(squares, dtype=np.uint8)[MAILBOX]
+        return float(taper(self.code_table[board, SQUARE_INDEX].sum(),
+                           self.endgame_code_table[board, SQUARE_INDEX].sum(),
+                           PHASE_TABLE[board].sum()))
+
+    def evaluate_batch(self, boards):
+        """White's scores of an (N, 64) stack of board_array() boards, as an (N,) array."""
+        return taper(self.code_table[boards, SQUARE_INDEX].sum(axis=1),
+                     self.endgame_code_table[boards, SQUARE_INDEX].sum(axis=1),
+                     PHASE_TABLE[boards].sum(axis=1))
+
+
+def taper(middlegame, endgame, phase):
+    """The middlegame score weighted by phase (capped at TOTAL_PHASE, as after promotions) and the
+    endgame score by what is missing to it; works on scalars and NumPy arrays alike."""
+    phase = np.minimum(phase, TOTAL_PHASE)
+    return (middlegame * phase + endgame * (TOTAL_PHASE - phase)) / TOTAL_PHASE
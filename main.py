@@ -1,5 +1,7 @@
 from chessboard import ChessBoard, Move
+from position import Position, COLORS, BLACK
 from minimax import Minimax
+from engine import EngineProcess, move_from_packed
 from agent import Agent
 import tkinter as tk
 
@@ -12,18 +14,35 @@ import json
 import copy
 
 class thread(threading.Thread): 
-    def __init__(self, thread_name, thread_ID, board, play = False, goFirst = "white", difficulty = "intermediate"): 
-        threading.Thread.__init__(self) 
+    def __init__(self, thread_name, thread_ID, board, play = False, goFirst = "white", difficulty = "intermediate",
+                 engine_process = False): 
+        # daemon, so closing the window does not wait on a thread blocked for the player's move
+        threading.Thread.__init__(self, daemon=True) 
         self.thread_name = thread_name 
         self.thread_ID = thread_ID 
         self.board = board
         self.player = play
         self.goFirst = goFirst
-        self.minimax_depth = 3
+        # the game as the engine sees it, kept in step with the window's position; make/undo,
+        # pondering and the engine process go by its side to move, so that is the side going first
+        snapshot = board.position.snapshot()
+        self.position = Position.from_snapshot((snapshot[0], COLORS[goFirst]) + snapshot[2:])
+        # deepest search and seconds per move, whichever is reached first;
+        # quiescence search settles captures past this depth. Root moves are searched one ply
+        # shallower, so null-move pruning and LMR (NULL_MOVE_MIN_DEPTH, LMR_MIN_DEPTH) only
+        # start paying off from depth 4
+        self.minimax_depth = 4
+        self.minimax_time = 3.0
         if difficulty == "easy":
-            self.minimax_depth = 2
+            self.minimax_depth = 3
+            self.minimax_time = 1.0
         elif difficulty == "hard":
-            self.minimax_depth = 4
+            self.minimax_depth = 6
+            self.minimax_time = 5.0
+        # search in a child process (engine.EngineProcess) so the window never waits on the GIL
+        self.engine_process = engine_process
+        self.engine = None
+        self.stopped = False
         # helper function to execute the threads
     def time_convert(self,sec):
         sec = int(sec)
@@ -32,109 +51,48 @@ class thread(threading.Thread):
         hours = mins // 60
         mins = mins % 60
     def run(self): 
-        agent = Agent(board, 'white')
-        minimax = Minimax(self.minimax_depth, board)
-        count = 1
-        while not board.is_game_over():
-            if self.goFirst == "white":
-                if self.player:
-                    self.board.current_player = "white"
-                    while (self.board.player_move is None):
-                        time.sleep(0)
-                    board.make_move(board.player_move)
-                    print(f"Move {count}: Player moves {self.board.player_move}")
-     
-                    board.player_move = None    
-                else:
-                    time.sleep(1)
-                    agent_move = agent.get_random_move()
-                    if agent_move is None:
-                        print("Game over! White has no more moves.")
-                        break
-                    board.make_move(agent_move)     
-                    print(f"Move {count}: White moves {agent_move}")
-            
-                    #[print(move) for move in board.get_all_possible_moves('black')]
-                board.boardDisplay()
-
-                if board.is_game_over():
-                    if board.get_winner() == 'black':
-                        print("Black wins!")
-                    elif board.get_winner() == 'white':
-                        print("White wins!")
-                    else:
-                        print("It's a draw!")
-                    break
-                self.board.current_player = "black"
-
-                minimax_move = minimax.get_best_move_for_black()
-                print(f"Move {count}: Black moves {minimax_move}")
-                if minimax_move is None:
-                    print("Game over! Black has no more moves.")
-                    break
-                board.make_move(minimax_move)
-                board.boardDisplay()
-
-        
-                count += 1
-        
-                if board.is_game_over():
-                    if board.get_winner() == 'black':
-                        print("Black wins!")
-                    elif board.get_winner() == 'white':
-                        print("White wins!")
+        # engine side works on its own copy of the game; the window applies every move to its
+        # position on the Tk thread, so the two never race
+        agent = Agent(self.position, 'white')
+        minimax = Minimax(self.minimax_depth, self.position, time_limit=self.minimax_time)
+        if self.engine_process:
+            self.engine = EngineProcess(self.minimax_depth, self.minimax_time)
+        try:
+            sides = ["white", "black"] if self.goFirst == "white" else ["black", "white"]
+            count = 1
+            while not self.position.is_game_over():
+                for side in sides:
+                    if side == "black":
+                        self.board.post(self.board.show_turn, "black")
+                        move = self.engine_move() if self.engine else minimax.get_best_move_for_black()
+                        name = "Black"
+                    elif self.player:
+                        move = self.wait_for_player(minimax)
+                        name = "Player"
                     else:
-                        print("It's a draw!")
-                    break
-            else:
-                
-                self.board.current_player = "black"
-
-                minimax_move = minimax.get_best_move_for_black()
-                print(f"Move {count}: Black moves {minimax_move}")
-                if minimax_move is None:
-                    print("Game over! Black has no more moves.")
-                    break
-                board.make_move(minimax_move)
-                board.boardDisplay()
-                if board.is_game_over():
-                    if board.get_winner() == 'black':
-                        print("Black wins!")
-                    elif board.get_winner() == 'white':
-                        print("White wins!")
-                    else:
-                        print("It's a draw!")
-                    break
-                if self.player:
-                    self.board.current_player = "white"
-                    while (self.board.player_move is None):
-                        time.sleep(0)
-                    board.make_move(board.player_move)
-                    print(f"Move {count}: Player moves {self.board.player_move}")
-     
-                    board.player_move = None    
-                else:
-                    time.sleep(1)
-                    agent_move = agent.get_random_move()
-                    if agent_move is None:
-                        print("Game over! White has no more moves.")
+                        time.sleep(1)
+                        move = agent.get_random_move()
+                        name = "White"
+                    if self.stopped:
+                        return
+                    if move is None:
+                        print(f"Game over! {side.capitalize()} has no more moves.")
+                        return
+                    self.position.make_move(move)
+                    self.board.post(self.board.show_move, move)
+                    print(f"Move {count}: {name} moves {move}")
+                    if self.position.is_game_over():
+                        if self.position.get_winner() == 'black':
+                            print("Black wins!")
+                        elif self.position.get_winner() == 'white':
+                            print("White wins!")
+                        else:
+                            print("It's a draw!")
                         break
-                    board.make_move(agent_move)     
-                    print(f"Move {count}: White moves {agent_move}")
-            
-                    #[print(move) for move in board.get_all_possible_moves('black')]
-                board.boardDisplay()
                 count += 1
-        
-                if board.is_game_over():
-                    if board.get_winner() == 'black':
-                        print("Black wins!")
-                    elif board.get_winner() == 'white':
-                        print("White wins!")
-                    else:
-                        print("It's a draw!")
-                    break
-                
+        finally:
+            if self.engine:
+                self.engine.close()
     
         print(minimax.get_moves_time())
         end_time = time.time()
@@ -142,6 +100,34 @@ class thread(threading.Thread):
 
         execution_time = end_time - start_time
         memory_consumption = end_memory - start_memory
+
+    def wait_for_player(self, minimax):
+        """Hands the turn to the player and blocks until a move is dropped, pondering meanwhile."""
+        self.board.post(self.board.show_turn, "white")
+        moves = self.board.player_moves
+        if self.engine:
+            self.engine.ponder(self.position)
+            move = moves.get()
+            self.engine.cancel()
+            return move
+        minimax.ponder(lambda: not moves.empty())
+        return moves.get()
+
+    def engine_move(self):
+        """Black's move from the engine process, showing its progress in the window title."""
+        def progress(info):
+            self.board.post(self.board.title, f"Chess game - depth {info['depth']}, score {info['score']:.1f}, "
+                                              f"{info['nodes']} nodes, {info['nps']:.0f} nodes/s")
+        self.engine.search(self.position, False)
+        packed = self.engine.wait(progress)
+        return move_from_packed(self.position, packed, BLACK) if packed is not None else None
+
+    def stop(self):
+        """Ends the game: stops the engine's search and wakes the thread if it waits for the player."""
+        self.stopped = True
+        if self.engine:
+            self.engine.stop()
+        self.board.player_moves.put(None)
         
 if __name__ == '__main__':
     start_time = time.time()
@@ -172,6 +158,10 @@ if __name__ == '__main__':
 
     thread1 = thread("GFG", 1000,board,play=False,goFirst="white", difficulty= "intermediate") 
     thread1.start()
+    def close():
+        thread1.stop()
+        board.destroy()
+    board.protocol("WM_DELETE_WINDOW", close)
     board.mainloop()
     
 
@@ -1,11 +1,181 @@
-from chessboard import ChessBoard, Move
+from position import (Position, Move, SQUARES, ROW_COL, TYPE_MASK, COLOR_MASK, COLOR_NAMES,
+                      TOTAL_PHASE, PHASE_WEIGHTS, WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER
+from evaluation import NumpyEvaluator
+from pawns import PawnHashTable
+from concurrent.futures import ProcessPoolExecutor, wait
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where peak memory is not reported
+    resource = None
+import json
+import multiprocessing
+import os
+import sys
+import threading
 import time
-import psutil
+
+# material value indexed by piece type
+PIECE_VALUES = [0, 10, 30, 30, 50, 90, 1000]
+
+# Score of being checkmated at the root; mates found deeper score MATE_SCORE - ply,
+# so anything beyond MATE_BOUND is a forced mate
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - 1000
+
+# Move ordering: sort keys of each class of move, history scores stay below KILLER_SCORE
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 200000
+KILLER_SCORE = 100000
+HISTORY_MAX = KILLER_SCORE - 2
+MAX_PLY = 64
+
+# Principal variation search: width of the null window used to test a move against alpha,
+# and the half-width of the aspiration window around the previous iteration's score
+NULL_WINDOW = 0.01
+ASPIRATION_WINDOW = 5
+
+# Null-move pruning: depth reduction of the null-move search, shallowest depth it is tried at, and
+# the most non-pawn pieces the side to move may have for a null-move cutoff to need verification
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_VERIFY_PIECES = 2
+
+# Late move reductions: quiet moves after the first LMR_MIN_INDEX moves of a node at least
+# LMR_MIN_DEPTH deep are searched LMR_REDUCTION plies shallower first
+LMR_MIN_DEPTH = 3
+LMR_MIN_INDEX = 3
+LMR_REDUCTION = 1
+
+# Search statistics: moves tracked separately in the beta cutoff histogram, and the parts of the
+# search timed with profile=True
+CUTOFF_HISTOGRAM_SIZE = 8
+
+# Search counters a parallel search adds up over its worker tasks, see _wait_tasks
+WORKER_COUNTERS = ('nodes', 'qnodes', 'cutoffs', 'first_move_cutoffs', 'pvs_researches', 'aspiration_fails',
+                   'null_cutoffs', 'null_verifications', 'lmr_reductions', 'lmr_researches', 'see_pruned', 'tt_cuts')
+# Transposition and pawn hash table probes and hits of the worker tasks, counted in the workers' own tables
+WORKER_TABLE_COUNTERS = ('tt_probes', 'tt_hits', 'pawn_probes', 'pawn_hits')
+TIMERS = ('movegen', 'eval', 'make_undo')
+TIMED_BOARD_METHODS = (('get_all_possible_moves', 'movegen'), ('get_all_captures', 'movegen'),
+                       ('make_move', 'make_undo'), ('undo_move', 'make_undo'), ('make_null_move', 'make_undo'))
+
+# Pondering searches the replies other than the expected one this many plies shallower
+PONDER_DEPTH = 1
+
+# Seconds between checks of stop_check and the node limit while worker processes search
+PARALLEL_POLL_SECONDS = 0.01
+
+# Quiescence delta pruning: a capture is skipped if even winning the victim plus this margin
+# leaves the static score at or below alpha
+DELTA_MARGIN = 20
+
+# Mate scores are stored relative to the node rather than the root, so a
+# transposition reached at a different ply still reports the right distance
+def score_to_tt(score, ply):
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+def score_from_tt(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+def peak_memory_mb():
+    """Peak resident memory of the process so far in MB, 0.0 where it cannot be read."""
+    if resource is None:
+        return 0.0
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget of the current move runs out."""
+    pass
 
 class Minimax:
-    def __init__(self, depth, board):
+    def __init__(self, depth, board, tt_size_mb=16, time_limit=None, quiescence=True, null_move=True, lmr=True,
+                 workers=1, tt=None, profile=False, check_eval=False, pawn_hash_mb=1, see=True):
         self.depth = depth
         self.board = board
+        # extend captures and promotions past depth 0 instead of evaluating there
+        self.quiescence = quiescence
+        # selective search: null-move pruning and late move reductions
+        self.null_move = null_move
+        self.lmr = lmr
+        # static exchange evaluation: losing captures are ordered last and skipped in quiescence
+        self.see = see
+        self.null_move_disabled = False
+        # root moves are split over this many worker processes when above 1, see _parallel_search
+        self.workers = workers
+        self._pool = None
+        self._shared_alpha = None
+        # set to make the workers end their tasks like at the deadline
+        self._shared_stop = None
+        # nodes searched so far by the parallel search, counted by the workers against the node limit
+        self._shared_nodes = None
+        # nodes searched by each worker process (by pid) in the last parallel search
+        self.worker_nodes = {}
+        # transposition and pawn hash table probes and hits of the workers in the last parallel search
+        self.worker_table_counts = dict.fromkeys(WORKER_TABLE_COUNTERS, 0)
+        self.search_time = 0.0
+        # seconds per move for get_best_move_for_white/black, None searches to self.depth regardless of time
+        self.time_limit = time_limit
+        self.deadline = None
+        # callable polled during the search, which ends it like the deadline once it returns True
+        self.stop_check = None
+        # called with a progress dict (see _report_progress) after every completed iterative deepening
+        # depth and whenever a new best root move is found
+        self.on_progress = None
+        # nodes (main and quiescence) after which a search ends like at the deadline, None for no limit
+        self.node_limit = None
+        self.search_start = 0.0
+        # main search and quiescence nodes of the last get_best_move call
+        self.nodes = 0
+        self.qnodes = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        # move ordering state, reset by every get_best_move call
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 120 for _ in range(COLOR_MASK + KING + 1)]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # beta cutoffs by index of the move that caused them, the last bucket counting all later moves
+        self.cutoff_histogram = [0] * CUTOFF_HISTOGRAM_SIZE
+        self.pvs_researches = 0
+        self.aspiration_fails = 0
+        self.null_cutoffs = 0
+        self.null_verifications = 0
+        self.lmr_reductions = 0
+        self.lmr_researches = 0
+        self.see_pruned = 0
+        # kept for the whole game, so later moves reuse what earlier searches found;
+        # a parallel search keeps it in shared memory for the workers to attach to
+        if tt is None:
+            tt = SharedTranspositionTable(tt_size_mb) if workers > 1 else TranspositionTable(tt_size_mb)
+        elif workers > 1 and not isinstance(tt, SharedTranspositionTable):
+            raise ValueError(f"workers={workers} needs a SharedTranspositionTable, got {type(tt).__name__}")
+        self.tt = tt
+        self.tt_cuts = 0
+        self.tt_probes_start = 0
+        self.tt_hits_start = 0
+        self.pawn_probes_start = 0
+        self.pawn_hits_start = 0
+        # set by ponder(), so the next search keeps the transposition table generation it filled
+        self._pondered = False
+        # cumulative nodes at every completed depth of the last search
+        self.depth_nodes = []
+        # seconds spent in move generation, evaluation and make/undo, measured only with profile=True
+        self.profile = profile
+        self.timers = dict.fromkeys(TIMERS, 0.0)
+        # search_stats() of every get_best_move_for_white/black call, with the move and its time
+        self.log_search_stats = []
         
         self.log_time_move = []
         # If the pawn is in the center of the board, it is worth more
@@ -93,165 +263,1036 @@ class Minimax:
     ]
         # Reverse the board to get the black king value by position
         self.__black_king_value_by_position = self.__white_king_value_by_position[::-1]
+
+        # In the endgame the king is a fighting piece: it belongs in the centre, next to the pawns
+        self.__white_king_endgame_value_by_position = self.__black_king_endgame_value_by_position = [
+        [-5.0, -4.0, -3.0, -2.0, -2.0, -3.0, -4.0, -5.0],
+        [-3.0, -2.0, -1.0,  0.0,  0.0, -1.0, -2.0, -3.0],
+        [-3.0, -1.0,  2.0,  3.0,  3.0,  2.0, -1.0, -3.0],
+        [-3.0, -1.0,  3.0,  4.0,  4.0,  3.0, -1.0, -3.0],
+        [-3.0, -1.0,  3.0,  4.0,  4.0,  3.0, -1.0, -3.0],
+        [-3.0, -1.0,  2.0,  3.0,  3.0,  2.0, -1.0, -3.0],
+        [-3.0, -3.0,  0.0,  0.0,  0.0,  0.0, -3.0, -3.0],
+        [-5.0, -3.0, -3.0, -3.0, -3.0, -3.0, -3.0, -5.0]
+    ]
+
+        # With the pieces gone, a pawn is worth more the closer it is to promotion, wherever its file
+        self.__white_pawn_endgame_value_by_position = [
+        [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+        [8.0,  8.0,  8.0,  8.0,  8.0,  8.0,  8.0,  8.0],
+        [5.0,  5.0,  5.0,  5.0,  5.0,  5.0,  5.0,  5.0],
+        [3.0,  3.0,  3.0,  3.0,  3.0,  3.0,  3.0,  3.0],
+        [1.5,  1.5,  1.5,  1.5,  1.5,  1.5,  1.5,  1.5],
+        [0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5],
+        [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+        [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0]
+    ]
+        # Reverse the board to get the black pawn endgame value by position
+        self.__black_pawn_endgame_value_by_position = self.__white_pawn_endgame_value_by_position[::-1]
+
+        # PST per piece code, looked up as [col][row] like the tables above
+        self.__value_by_position = {
+            WHITE | PAWN: self.__white_pawn_value_by_position,
+            BLACK | PAWN: self.__black_pawn_value_by_position,
+            WHITE | KNIGHT: self.__white_knight_value_by_position,
+            BLACK | KNIGHT: self.__black_knight_value_by_position,
+            WHITE | BISHOP: self.__white_bishop_value_by_position,
+            BLACK | BISHOP: self.__black_bishop_value_by_position,
+            WHITE | ROOK: self.__white_rook_value_by_position,
+            BLACK | ROOK: self.__black_rook_value_by_position,
+            WHITE | QUEEN: self.__white_queen_value_by_position,
+            BLACK | QUEEN: self.__black_queen_value_by_position,
+            WHITE | KING: self.__white_king_value_by_position,
+            BLACK | KING: self.__black_king_value_by_position,
+        }
+        # Endgame PST per piece code, looked up as [row][col]; pieces without an endgame table of
+        # their own keep their middlegame one, transposed to that orientation
+        self.__endgame_value_by_position = {
+            piece: [list(row) for row in zip(*table)] for piece, table in self.__value_by_position.items()
+        }
+        self.__endgame_value_by_position.update({
+            WHITE | PAWN: self.__white_pawn_endgame_value_by_position,
+            BLACK | PAWN: self.__black_pawn_endgame_value_by_position,
+            WHITE | KING: self.__white_king_endgame_value_by_position,
+            BLACK | KING: self.__black_king_endgame_value_by_position,
+        })
+        # material plus middlegame and endgame position value of every piece on each of the 64
+        # squares, scored as gathers blended by the game phase
+        self.evaluator = NumpyEvaluator(*(
+            {piece: [self._get_piece_value_by_type(piece) + self._get_piece_value_by_position(piece, row, col, endgame)
+                     for row in range(8) for col in range(8)]
+             for piece in self.__value_by_position}
+            for endgame in (False, True)
+        ))
+        # the same values per mailbox square, summed incrementally by the position's make/undo
+        self.psqt, self.psqt_eg = self.evaluator.mailbox_tables()
+        self.board.set_evaluation(self.psqt, self.psqt_eg)
+        # doubled, isolated and passed pawns, cached by pawn structure for the whole game; passed
+        # pawns earn their endgame table value once more
+        self.pawns = PawnHashTable(self.__white_pawn_endgame_value_by_position, pawn_hash_mb)
+        # debug mode: every incremental score is compared with a full evaluation of the board
+        if check_eval:
+            self._evaluate = self._evaluate_checked
         
     def _get_piece_value_by_type(self, piece):
-        _, piece_type = piece.split('_')
-        
-        if piece_type == 'pawn':
-            return 10
-        elif piece_type == 'knight' or piece_type == 'bishop':
-            return 30
-        elif piece_type == 'rook':
-            return 50
-        elif piece_type == 'queen':
-            return 90
-        elif piece_type == 'king':
-            return 1000
-            
-
-    def _get_piece_value_by_position(self, piece, row, col):
-        piece_color, piece_type = piece.split('_')
-        
-        
-        if piece_type == 'pawn':
-            if piece_color == 'white':
-                return self.__white_pawn_value_by_position[col][row]
-            else:
-                return self.__black_pawn_value_by_position[col][row]
-        elif piece_type == 'knight':
-            if piece_color == 'white':
-                return self.__white_knight_value_by_position[col][row]
-            else:
-                return self.__black_knight_value_by_position[col][row]
-        elif piece_type == 'bishop':
-            if piece_color == 'white':
-                return self.__white_bishop_value_by_position[col][row]
-            else:
-                return self.__black_bishop_value_by_position[col][row]
-        elif piece_type == 'rook':
-            if piece_color == 'white':
-                return self.__white_rook_value_by_position[col][row]
-            else:
-                return self.__black_rook_value_by_position[col][row]
-        elif piece_type == 'queen':
-            if piece_color == 'white':
-                return self.__white_queen_value_by_position[col][row]
-            else:
-                return self.__black_queen_value_by_position[col][row]
-        elif piece_type == 'king':
-            if piece_color == 'white':
-                return self.__white_king_value_by_position[col][row]
-            else:
-                return self.__black_king_value_by_position[col][row]
-        return 0
+        return PIECE_VALUES[piece & TYPE_MASK]
+
+    def _get_piece_value_by_position(self, piece, row, col, endgame=False):
+        if endgame:
+            return self.__endgame_value_by_position[piece][row][col]
+        return self.__value_by_position[piece][col][row]
+
+    def _get_piece_value(self, piece, row, col, endgame=False):
+        total_value = self._get_piece_value_by_type(piece) + self._get_piece_value_by_position(piece, row, col, endgame)
+        return total_value if piece & WHITE else -total_value
+
+    def _evaluate(self):
+        """White's score of self.board: the middlegame and endgame scores its make/undo keep,
+        blended by the game phase they keep alongside, plus the cached pawn structure."""
+        board = self.board
+        phase = board.phase if board.phase < TOTAL_PHASE else TOTAL_PHASE
+        return ((board.score * phase + board.score_eg * (TOTAL_PHASE - phase)) / TOTAL_PHASE
+                + self.pawns.probe(board))
 
-    def _get_piece_value(self, piece, row, col):
-        total_value = self._get_piece_value_by_type(piece) + self._get_piece_value_by_position(piece, row, col)
-        piece_color, _ = piece.split('_')
-        return total_value if piece_color == 'white' else -total_value
+    def _evaluate_checked(self):
+        score = Minimax._evaluate(self)
+        full = self._evaluate_board(self.board.squares)
+        if abs(score - full) > 1e-6:
+            raise AssertionError(f"incremental score {score} differs from evaluation {full} after {self.board.last_move}")
+        return score
 
     def _evaluate_board(self, chess_board):
-        total_score = 0
-        for row in range(8):
-            for col in range(8):
-                piece = chess_board[row][col]
-                if piece != '':
-                    total_score += self._get_piece_value(piece, row, col)
-        return total_score
+        """White's score of a board evaluated from scratch."""
+        return self.evaluator.evaluate(chess_board) + self.pawns.evaluate(chess_board)
+
+    def evaluate_boards(self, boards):
+        """Scores an (N, 64) stack of evaluation.board_array() boards for white in one call."""
+        return self.evaluator.evaluate_batch(boards) + [self.pawns.evaluate_board_array(board) for board in boards]
+
+    def _evaluate_board_by_squares(self, chess_board):
+        """Square by square evaluation, the reference the evaluator's table is checked against."""
+        middlegame = endgame = 0
+        phase = 0
+        for sq in SQUARES:
+            piece = chess_board[sq]
+            if piece:
+                row, col = ROW_COL[sq]
+                middlegame += self._get_piece_value(piece, row, col)
+                endgame += self._get_piece_value(piece, row, col, True)
+                phase += PHASE_WEIGHTS[piece]
+        phase = min(phase, TOTAL_PHASE)
+        return (middlegame * phase + endgame * (TOTAL_PHASE - phase)) / TOTAL_PHASE + self.pawns.evaluate(chess_board)
     
-    def _minimax(self, depth, chess_board, is_maximizing_player, alpha, beta):
+    def _order_moves(self, moves, hash_move, ply, see=True):
+        """Sorts moves so the likeliest cutoffs come first.
+
+        Order: the transposition table move, captures and promotions by most valuable victim /
+        least valuable attacker, the two killer moves of this ply, quiet moves by history score, then
+        captures that lose material by static exchange evaluation (if see and self.see are set).
+        """
+        board = self.board
+        squares = board.squares
+        killers = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        history = self.history
+        see = see and self.see
+        def score(move):
+            packed = move.packed
+            if packed == hash_move:
+                return HASH_MOVE_SCORE
+            victim = squares[move.dst] & TYPE_MASK
+            if move.special_move == "en_passant":
+                victim = PAWN
+            if victim or move.promoted_piece:
+                attacker = PIECE_VALUES[move.piece & TYPE_MASK]
+                # only a capture of a cheaper piece can lose material
+                if see and PIECE_VALUES[victim] < attacker:
+                    exchange = board.see(move, PIECE_VALUES)
+                    if exchange < 0:
+                        return exchange
+                value = PIECE_VALUES[victim] + PIECE_VALUES[move.promoted_piece & TYPE_MASK]
+                return CAPTURE_SCORE + 10 * value - attacker // 10
+            if packed == killers[0]:
+                return KILLER_SCORE
+            if packed == killers[1]:
+                return KILLER_SCORE - 1
+            return history[move.piece][move.dst]
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def _record_cutoff(self, move, index, depth, ply):
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        self.cutoff_histogram[min(index, CUTOFF_HISTOGRAM_SIZE - 1)] += 1
+        # only quiet moves become killers / get history credit, captures are already ordered first
+        if self.board.squares[move.dst] or move.promoted_piece or move.special_move == "en_passant":
+            return
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move.packed:
+                killers[1] = killers[0]
+                killers[0] = move.packed
+        self.history[move.piece][move.dst] = min(self.history[move.piece][move.dst] + depth * depth, HISTORY_MAX)
+
+    def ordering_stats(self):
+        """Beta cutoffs of the last search and how many of them came from the first move tried."""
+        return {
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
+
+    def _quiescence(self, alpha, beta, color, ply):
+        """Searches captures and promotions only, so the horizon is never scored mid-exchange.
+
+        The side to move may always stand pat on the static evaluation. Captures that could not
+        lift the score back to alpha even by winning the victim outright (delta pruning) are skipped,
+        and so are captures that lose material by static exchange evaluation.
+        """
+        self.qnodes += 1
+        if not self.qnodes & 255 and self._should_stop():
+            raise SearchTimeout()
+        board = self.board
+        stand_pat = self._evaluate()
+        if color == BLACK:
+            stand_pat = -stand_pat
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        squares = board.squares
+        for move in self._order_moves(board.get_all_captures(COLOR_NAMES[color]), 0, ply, see=False):
+            if not move.promoted_piece:
+                victim = PAWN if move.special_move == "en_passant" else squares[move.dst] & TYPE_MASK
+                if stand_pat + PIECE_VALUES[victim] + DELTA_MARGIN <= alpha:
+                    continue
+                if (self.see and PIECE_VALUES[victim] < PIECE_VALUES[move.piece & TYPE_MASK]
+                        and board.see(move, PIECE_VALUES) < 0):
+                    self.see_pruned += 1
+                    continue
+            board.make_move(move)
+            eval = -self._quiescence(-beta, -alpha, color ^ COLOR_MASK, ply + 1)
+            board.undo_move()
+            if eval >= beta:
+                return eval
+            if eval > alpha:
+                alpha = eval
+        return alpha
+
+    def _minimax(self, depth, alpha, beta, color, ply):
+        """Alpha-beta search in negamax form.
+
+        Returns the score of the position for `color` (WHITE or BLACK), the side to move.
+        """
         if depth == 0:
-            return self._evaluate_board(chess_board)
-        
-        if is_maximizing_player:
-            max_eval = float('-inf')
-            for move in self.board.get_all_possible_moves('white'):
-                self.board.make_move(move)
-                eval = self._minimax(depth - 1, self.board.get_board()[0], False, alpha, beta)
-                self.board.undo_move()
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                if beta <= alpha:
-                    return max_eval
-            return max_eval
+            if self.quiescence:
+                return self._quiescence(alpha, beta, color, ply)
+            score = self._evaluate()
+            return score if color == WHITE else -score
+        self.nodes += 1
+        if not self.nodes & 255 and self._should_stop():
+            raise SearchTimeout()
+        board = self.board
+
+        key = board.position_key()
+        hash_move = 0
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, bound, tt_score, hash_move = entry
+            if tt_depth >= depth:
+                tt_score = score_from_tt(tt_score, ply)
+                if bound == EXACT or bound == LOWER and tt_score >= beta or bound == UPPER and tt_score <= alpha:
+                    self.tt_cuts += 1
+                    return tt_score
+
+        player = COLOR_NAMES[color]
+        in_check = None
+        if depth >= NULL_MOVE_MIN_DEPTH:
+            in_check = board.isCheck(None, player)
+            if self.null_move and not in_check:
+                score = self._null_move_search(depth, beta, color, ply)
+                if score is not None:
+                    return score
+
+        moves = board.get_all_possible_moves(player)
+        if not moves:
+            # checkmated, the sooner the worse; stalemate is a draw
+            return -(MATE_SCORE - ply) if board.isCheck(None, player) else 0
+        moves = self._order_moves(moves, hash_move, ply)
+
+        alpha_orig = alpha
+        best_eval = float('-inf')
+        best_move = None
+        reduce_late = self.lmr and depth >= LMR_MIN_DEPTH and not in_check
+        for index, move in enumerate(moves):
+            reduce = reduce_late and index >= LMR_MIN_INDEX and self._is_quiet(move, ply)
+            board.make_move(move)
+            if reduce:
+                # a late quiet move is first searched shallower and only searched fully if it beats alpha
+                self.lmr_reductions += 1
+                eval = -self._minimax(depth - 1 - LMR_REDUCTION, -alpha - NULL_WINDOW, -alpha, color ^ COLOR_MASK, ply + 1)
+                if eval > alpha:
+                    self.lmr_researches += 1
+                    eval = self._pvs_child(index, depth - 1, alpha, beta, color ^ COLOR_MASK, ply + 1)
+            else:
+                eval = self._pvs_child(index, depth - 1, alpha, beta, color ^ COLOR_MASK, ply + 1)
+            board.undo_move()
+            if eval > best_eval:
+                best_eval = eval
+                best_move = move
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                self._record_cutoff(move, index, depth, ply)
+                break
+
+        if best_eval <= alpha_orig:
+            bound = UPPER
+        elif best_eval >= beta:
+            bound = LOWER
         else:
-            min_eval = float('inf')
-            for move in self.board.get_all_possible_moves('black'):
-                self.board.make_move(move)
-                eval = self._minimax(depth - 1, self.board.get_board()[0], True, alpha, beta)
-                self.board.undo_move()
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                if beta <= alpha:
-                    return min_eval
-            return min_eval
+            bound = EXACT
+        self.tt.store(key, depth, bound, score_to_tt(best_eval, ply), best_move.packed)
+        return best_eval
         
-    def get_best_move(self, is_maximizing_player: bool):
-        """Returns the best move for the player with the given color.
-        is_maximizing_player: True if the player is white, False if the player is black.
+    def _null_move_search(self, depth, beta, color, ply):
+        """Null-move pruning: lets the opponent move twice in a row at reduced depth.
+
+        If the side to move is still at or above beta after passing, a real move will be too, and the
+        returned score cuts the node off; None means search the node normally. Without any piece but
+        pawns passing is often the best move there is (zugzwang), so the null move is not tried at all,
+        and with few pieces a cutoff is only trusted after a reduced search of the real moves confirms it.
+        """
+        board = self.board
+        if self.null_move_disabled or abs(beta) >= MATE_BOUND or board.history and board.history[-1][0] is None:
+            return None
+        squares = board.squares
+        pieces = sum(squares.count(color | kind) for kind in (KNIGHT, BISHOP, ROOK, QUEEN))
+        if not pieces:
+            return None
+        board.make_null_move()
+        try:
+            score = -self._minimax(depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + NULL_WINDOW, color ^ COLOR_MASK, ply + 1)
+        finally:
+            board.undo_move()
+        if score < beta:
+            return None
+        if pieces <= NULL_MOVE_VERIFY_PIECES:
+            self.null_verifications += 1
+            self.null_move_disabled = True
+            try:
+                score = self._minimax(depth - NULL_MOVE_REDUCTION, beta - NULL_WINDOW, beta, color, ply)
+            finally:
+                self.null_move_disabled = False
+            if score < beta:
+                return None
+        self.null_cutoffs += 1
+        return score
+
+    def _is_quiet(self, move, ply):
+        """True for moves late move reductions may reduce: no capture, promotion or killer move."""
+        if self.board.squares[move.dst] or move.promoted_piece or move.special_move:
+            return False
+        return ply >= MAX_PLY or move.packed not in self.killers[ply]
+
+    def _pvs_child(self, index, depth, alpha, beta, color, ply):
+        """Principal variation search of one child, scored for the parent.
+
+        The first child gets the full window. The rest are only tested against alpha with a null
+        window, and searched again with the full window when that test says they are better.
         """
+        if index == 0:
+            return -self._minimax(depth, -beta, -alpha, color, ply)
+        eval = -self._minimax(depth, -alpha - NULL_WINDOW, -alpha, color, ply)
+        if alpha < eval < beta:
+            self.pvs_researches += 1
+            eval = -self._minimax(depth, -beta, -alpha, color, ply)
+        return eval
+
+    def _search_root(self, moves, depth, color, alpha, beta):
+        """Searches the root moves inside (alpha, beta); returns (best move, best score, scores by move)."""
+        alpha_orig = alpha
         best_move = None
-        best_eval = float('-inf') if is_maximizing_player else float('inf')
-        alpha = float('-inf')
-        beta = float('inf')
-        if is_maximizing_player:
-            for move in self.board.get_all_possible_moves('white'):
-                self.board.make_move(move)
-                eval = self._minimax(self.depth - 1, self.board.get_board()[0], False, alpha, beta)
-                self.board.undo_move()
-                if eval > best_eval:
-                    best_eval = eval
-                    best_move = move
+        best_eval = float('-inf')
+        scores = {}
+        for index, move in enumerate(moves):
+            self.board.make_move(move)
+            eval = self._pvs_child(index, depth - 1, alpha, beta, color ^ COLOR_MASK, 1)
+            self.board.undo_move()
+            scores[move] = eval
+            if eval > best_eval:
+                best_eval = eval
+                best_move = move
+                if index and alpha_orig < eval < beta:
+                    self._report_progress(depth, move, eval, False)
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                break
+        if best_eval <= alpha_orig:
+            bound = UPPER
+        elif best_eval >= beta:
+            bound = LOWER
         else:
-            for move in self.board.get_all_possible_moves('black'):
-                self.board.make_move(move)
-                eval = self._minimax(self.depth - 1, self.board.get_board()[0], True, alpha, beta)
-                self.board.undo_move()
-                if eval < best_eval:
-                    best_eval = eval
-                    best_move = move
-                
+            bound = EXACT
+        self.tt.store(self.board.position_key(), depth, bound, score_to_tt(best_eval, 0), best_move.packed)
+        return best_move, best_eval, scores
+
+    def get_best_move(self, is_maximizing_player: bool = None, time_limit=None, max_depth=None, node_limit=None):
+        """Returns the best move for the player with the given color.
+        is_maximizing_player: True if the player is white, False if the player is black,
+                              None for the side to move in the position.
+        time_limit: seconds to spend; when it runs out the best move of the last completed depth is returned.
+        max_depth: deepest iteration to search, self.depth by default.
+        node_limit: nodes to search at most, ending the search like time_limit does.
+        """
+        if is_maximizing_player is None:
+            color = self.board.side_to_move
+        else:
+            color = WHITE if is_maximizing_player else BLACK
+        if max_depth is None:
+            max_depth = self.depth
+        self._reset_search(time.time() + time_limit if time_limit is not None else None, node_limit)
+        if self.profile:
+            self._start_timers()
+        try:
+            return self._iterative_deepening(color, max_depth)
+        finally:
+            if self.profile:
+                self._stop_timers()
+            self.search_time = time.time() - self.search_start
+
+    def _iterative_deepening(self, color, max_depth):
+        moves = self.board.get_all_possible_moves(COLOR_NAMES[color])
+        if not moves:
+            return None
+        moves = self._order_moves(moves, 0, 0)
+        if self.workers > 1:
+            return self._parallel_search(moves, max_depth)
+        best_move = moves[0]
+        root_history = len(self.board.history)
+        # Iterative deepening: each depth is searched with the root moves sorted by the previous
+        # depth's scores, and the moves it stores in the transposition table are tried first below the root
+        for depth in range(1, max_depth + 1):
+            # aspiration window around the previous depth's score; the side that fails is opened up
+            alpha = float('-inf')
+            beta = float('inf')
+            if depth > 1 and abs(self.best_score) < MATE_BOUND:
+                alpha = self.best_score - ASPIRATION_WINDOW
+                beta = self.best_score + ASPIRATION_WINDOW
+            try:
+                while True:
+                    move, score, scores = self._search_root(moves, depth, color, alpha, beta)
+                    if score <= alpha:
+                        alpha = float('-inf')
+                    elif score >= beta:
+                        beta = float('inf')
+                    else:
+                        break
+                    self.aspiration_fails += 1
+            except SearchTimeout:
+                while len(self.board.history) > root_history:
+                    self.board.undo_move()
+                break
+            best_move = move
+            self.best_score = score
+            self.completed_depth = depth
+            self.depth_nodes.append(self.nodes + self.qnodes)
+            self._report_progress(depth, best_move, score, True)
+            moves.sort(key=lambda move: scores.get(move, float('-inf')), reverse=True)
+        return best_move
+
+    def _reset_search(self, deadline, node_limit=None, new_search=True):
+        """Clears the counters and move ordering state before a search. new_search starts a new
+        transposition table generation; workers searching part of the parent's search leave it."""
+        if self.board.psqt is not self.psqt:
+            self.board.set_evaluation(self.psqt, self.psqt_eg)
+        self.deadline = deadline
+        self.node_limit = node_limit
+        self.search_start = time.time()
+        self.nodes = 0
+        self.qnodes = 0
+        self.completed_depth = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_histogram = [0] * CUTOFF_HISTOGRAM_SIZE
+        self.pvs_researches = 0
+        self.aspiration_fails = 0
+        self.null_cutoffs = 0
+        self.null_verifications = 0
+        self.lmr_reductions = 0
+        self.lmr_researches = 0
+        self.see_pruned = 0
+        self.null_move_disabled = False
+        self.worker_nodes = {}
+        self.worker_table_counts = dict.fromkeys(WORKER_TABLE_COUNTERS, 0)
+        self.depth_nodes = []
+        self.tt_cuts = 0
+        # the search right after a ponder stays in the ponder's generation, see ponder()
+        if new_search and not self._pondered:
+            self.tt.new_search()
+        self._pondered = False
+        self.tt_probes_start = self.tt.probes
+        self.tt_hits_start = self.tt.hits
+        self.pawn_probes_start = self.pawns.probes
+        self.pawn_hits_start = self.pawns.hits
+        self.timers = dict.fromkeys(TIMERS, 0.0)
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 120 for _ in range(COLOR_MASK + KING + 1)]
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawned rather than forked: the GUI runs the search from a thread next to Tk
+            context = multiprocessing.get_context('spawn')
+            self._shared_alpha = context.Value('d', float('-inf'))
+            self._shared_stop = context.Event()
+            self._shared_nodes = context.Value('q', 0)
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                             initargs=(self._shared_alpha, self._shared_stop, self._shared_nodes,
+                                                       self.tt.name,
+                                                       self.quiescence, self.null_move, self.lmr, self.see))
+        return self._pool
+
+    def _parallel_search(self, moves, max_depth):
+        """Iterative deepening with the root moves split over the worker processes.
+
+        At every depth the first move, the best of the previous depth, is searched on its own so its
+        score can serve as the shared alpha bound; the remaining moves are then handed out one per
+        task, each worker testing its move against the best score any worker has found so far.
+        Workers end their tasks at the deadline, once their shared node count reaches the node
+        limit, and as soon as stop_check stops this search, see _wait_tasks.
+        """
+        pool = self._get_pool()
+        self._shared_stop.clear()
+        self._shared_nodes.value = self.nodes + self.qnodes
+        snapshot = self.board.snapshot()
+        by_packed = {move.packed: move for move in moves}
+        best_move = moves[0]
+        def submit(move):
+            return pool.submit(_search_root_moves, snapshot, [move.packed], depth, self.deadline, self.node_limit)
+        for depth in range(1, max_depth + 1):
+            if self._should_stop():
+                break
+            self._shared_alpha.value = float('-inf')
+            scores = {}
+            tasks = self._wait_tasks([submit(moves[0])])
+            if tasks[0] is not None:
+                tasks += self._wait_tasks([submit(move) for move in moves[1:]])
+            if None in tasks:
+                break
+            for results in tasks:
+                scores.update(results)
+            best = max(scores, key=scores.get)
+            best_move = by_packed[best]
+            self.best_score = scores[best]
+            self.completed_depth = depth
+            self.depth_nodes.append(self.nodes + self.qnodes)
+            self._report_progress(depth, best_move, self.best_score, True)
+            moves.sort(key=lambda move: scores[move.packed], reverse=True)
         return best_move
+
+    def _wait_tasks(self, futures):
+        """Waits for worker tasks and returns their results in order, adding up their nodes, cutoffs,
+        pruning and table counters as they finish. Sets the shared stop event once _should_stop()
+        is True, so the workers give up their tasks early instead of at the end of the depth."""
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=PARALLEL_POLL_SECONDS)
+            for future in done:
+                pid, counts, _ = future.result()
+                self.worker_nodes[pid] = self.worker_nodes.get(pid, 0) + counts['nodes'] + counts['qnodes']
+                for name in WORKER_COUNTERS:
+                    setattr(self, name, getattr(self, name) + counts[name])
+                for name in WORKER_TABLE_COUNTERS:
+                    self.worker_table_counts[name] += counts[name]
+                self.cutoff_histogram = [ours + theirs for ours, theirs
+                                         in zip(self.cutoff_histogram, counts['cutoff_histogram'])]
+            if pending and self._should_stop():
+                self._shared_stop.set()
+        return [future.result()[2] for future in futures]
+
+    def parallel_stats(self):
+        """Worker count, nodes searched by each worker and wall time of the last search."""
+        return {
+            'workers': self.workers,
+            'nodes_per_worker': sorted(self.worker_nodes.values(), reverse=True),
+            'search_time': self.search_time,
+        }
+
+    def close(self):
+        """Shuts the worker processes of a parallel Minimax down and frees its shared table."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if isinstance(self.tt, SharedTranspositionTable):
+            self.tt.close()
+
+    def pruning_stats(self):
+        """Null-move cutoffs and verifications, late move reductions and their re-searches and
+        quiescence captures skipped as losing in the last search."""
+        return {
+            'null_cutoffs': self.null_cutoffs,
+            'null_verifications': self.null_verifications,
+            'lmr_reductions': self.lmr_reductions,
+            'lmr_researches': self.lmr_researches,
+            'see_pruned': self.see_pruned,
+        }
+
+    def window_stats(self):
+        """Null-window re-searches and aspiration window fails of the last search."""
+        return {
+            'pvs_researches': self.pvs_researches,
+            'aspiration_fails': self.aspiration_fails,
+        }
     
+    def _should_stop(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            return True
+        if self.node_limit is not None and self.nodes + self.qnodes >= self.node_limit:
+            return True
+        return self.stop_check is not None and self.stop_check()
+
+    def _report_progress(self, depth, move, score, completed):
+        """Calls on_progress with the search state: depth (completed or still running), best move and
+        score, principal variation, nodes, nodes per second and seconds since the search started."""
+        if self.on_progress is None:
+            return
+        elapsed = time.time() - self.search_start
+        nodes = self.nodes + self.qnodes
+        self.on_progress({
+            'depth': depth,
+            'completed': completed,
+            'move': move,
+            'score': score,
+            'pv': self.principal_variation(move, depth),
+            'nodes': nodes,
+            'nps': nodes / elapsed if elapsed else 0.0,
+            'time': elapsed,
+        })
+
+    def principal_variation(self, move, length):
+        """move followed by the transposition table moves of the positions it leads to, at most length moves."""
+        board = self.board
+        pv = []
+        while move is not None and len(pv) < length:
+            pv.append(move)
+            board.make_move(move)
+            entry = self.tt.probe(board.position_key())
+            move = None
+            if entry is not None and entry[3]:
+                for candidate in board.get_all_possible_moves(COLOR_NAMES[board.side_to_move]):
+                    if candidate.packed == entry[3]:
+                        move = candidate
+                        break
+        for _ in pv:
+            board.undo_move()
+        return pv
+
+    def start_search(self, time_limit=None, max_depth=None, node_limit=None, on_progress=None):
+        """Starts get_best_move for the side to move in a background thread and returns its SearchHandle.
+
+        The handle's best_move is a legal move from the start on and follows every progress report,
+        so a move can be played whenever the search is stopped.
+        """
+        handle = SearchHandle(self, on_progress)
+        moves = self.board.get_all_possible_moves(COLOR_NAMES[self.board.side_to_move])
+        if moves:
+            entry = self.tt.probe(self.board.position_key())
+            handle.best_move = self._order_moves(moves, entry[3] if entry is not None else 0, 0)[0]
+        self.stop_check = handle.stop_event.is_set
+        self.on_progress = handle._progress
+        handle.thread = threading.Thread(target=handle._run, args=(time_limit, max_depth, node_limit), daemon=True)
+        handle.thread.start()
+        return handle
+
+    def ponder(self, should_stop, max_depth=None):
+        """Searches on the opponent's time, filling the transposition table for the coming move.
+
+        The position is the one in self.board with the opponent to move. The expected reply, the
+        transposition table move of the position, is searched first to max_depth (self.depth by
+        default), every other reply after it PONDER_DEPTH plies shallower. The search works on a
+        copy of the position, so the board may be read meanwhile, and returns as soon as
+        should_stop() is True; the next get_best_move then starts from the warm table. The whole
+        ponder and that search share one table generation, so the pondered entries are not given
+        up to every later search of the ponder itself.
+        """
+        if max_depth is None:
+            max_depth = self.depth
+        board = self.board
+        workers = self.workers
+        on_progress = self.on_progress
+        # pondering is stopped from this process, so it never goes to the worker pool
+        self.workers = 1
+        self.on_progress = None
+        self.board = Position.from_snapshot(board.snapshot())
+        self.stop_check = should_stop
+        self.tt.new_search()
+        try:
+            replies = self.board.get_all_possible_moves(COLOR_NAMES[self.board.side_to_move])
+            entry = self.tt.probe(self.board.position_key())
+            replies = self._order_moves(replies, entry[3] if entry is not None else 0, 0)
+            for index, reply in enumerate(replies):
+                if should_stop():
+                    break
+                self.board.make_move(reply)
+                self._reset_search(None, new_search=False)
+                self._iterative_deepening(self.board.side_to_move,
+                                          max_depth if index == 0 else max(1, max_depth - PONDER_DEPTH))
+                self.board.undo_move()
+        finally:
+            self._pondered = True
+            self.board = board
+            self.workers = workers
+            self.on_progress = on_progress
+            self.stop_check = None
+
+    def _start_timers(self):
+        """Wraps move generation, make/undo and evaluation in timers for one search.
+
+        The wrappers shadow the methods on the instances only, so without profile the search runs
+        the plain methods and pays nothing for the timing. Only the outermost timed call counts: the
+        make/undo that legal move generation does to test en passant is movegen time, not make_undo.
+        """
+        timers = self.timers
+        # timed calls currently running, so nested ones are not counted twice
+        running = [0]
+        def timed(function, name):
+            def wrapper(*args):
+                if running[0]:
+                    return function(*args)
+                running[0] = 1
+                start = time.perf_counter()
+                try:
+                    return function(*args)
+                finally:
+                    timers[name] += time.perf_counter() - start
+                    running[0] = 0
+            return wrapper
+        board = self.board
+        for method, name in TIMED_BOARD_METHODS:
+            setattr(board, method, timed(getattr(board, method), name))
+        # check_eval may have put its own _evaluate on the instance, which must come back afterwards
+        self._untimed_evaluate = self.__dict__.get('_evaluate')
+        self._evaluate = timed(self._evaluate, 'eval')
+
+    def _stop_timers(self):
+        for method, _ in TIMED_BOARD_METHODS:
+            self.board.__dict__.pop(method, None)
+        if self._untimed_evaluate is None:
+            del self._evaluate
+        else:
+            self._evaluate = self._untimed_evaluate
+
+    def search_stats(self):
+        """Statistics of the last search as a JSON-serialisable dict."""
+        nodes = self.nodes + self.qnodes
+        worker = self.worker_table_counts
+        tt_probes = self.tt.probes - self.tt_probes_start + worker['tt_probes']
+        tt_hits = self.tt.hits - self.tt_hits_start + worker['tt_hits']
+        pawn_probes = self.pawns.probes - self.pawn_probes_start + worker['pawn_probes']
+        pawn_hits = self.pawns.hits - self.pawn_hits_start + worker['pawn_hits']
+        # effective branching factor: growth of the node count from one completed depth to the next
+        depth_nodes = self.depth_nodes
+        branching_factor = depth_nodes[-1] / depth_nodes[-2] if len(depth_nodes) > 1 and depth_nodes[-2] else 0.0
+        stats = {
+            'depth': self.completed_depth,
+            'score': self.best_score,
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'search_time': self.search_time,
+            'nps': nodes / self.search_time if self.search_time else 0.0,
+            'branching_factor': branching_factor,
+            'cutoff_histogram': list(self.cutoff_histogram),
+            'tt_probes': tt_probes,
+            'tt_hits': tt_hits,
+            'tt_cuts': self.tt_cuts,
+            'tt_hit_rate': tt_hits / tt_probes if tt_probes else 0.0,
+            'tt_cut_rate': self.tt_cuts / tt_probes if tt_probes else 0.0,
+            'pawn_probes': pawn_probes,
+            'pawn_hits': pawn_hits,
+            'pawn_hit_rate': pawn_hits / pawn_probes if pawn_probes else 0.0,
+            'peak_memory_mb': peak_memory_mb(),
+        }
+        stats.update(self.ordering_stats())
+        stats.update(self.window_stats())
+        stats.update(self.pruning_stats())
+        if self.profile:
+            for name, seconds in self.timers.items():
+                stats['time_' + name] = seconds
+        return stats
+
     def get_best_move_for_white(self):
         start_time = time.time()
-        best_move = self.get_best_move(True)
+        best_move = self.get_best_move(True, self.time_limit)
         end_time = time.time()
         total_time = end_time - start_time
         self.log_time_move.append(total_time)
+        self.log_search_stats.append(dict(self.search_stats(), move=str(best_move), time=total_time))
         return best_move
     
     def get_best_move_for_black(self):
         start_time = time.time()
-        best_move = self.get_best_move(False)
+        best_move = self.get_best_move(False, self.time_limit)
         end_time = time.time()
         total_time = end_time - start_time
         self.log_time_move.append(total_time)
+        self.log_search_stats.append(dict(self.search_stats(), move=str(best_move), time=total_time))
         return best_move
 
-    def get_moves_time(self):
+    def get_moves_time(self, stats=False):
+        """Seconds taken by every move so far, or with stats=True the full search_stats() records."""
+        if stats:
+            return self.log_search_stats
         return self.log_time_move
+
+    def export_stats(self, path):
+        """Writes the search_stats() records of every move so far to path as JSON."""
+        with open(path, 'w') as file:
+            json.dump(self.log_search_stats, file, indent=2)
     
+class SearchHandle():
+    """A search started by Minimax.start_search, running in its own thread."""
+    def __init__(self, minimax, on_progress=None):
+        self.minimax = minimax
+        self.on_progress = on_progress
+        self.stop_event = threading.Event()
+        self.done_event = threading.Event()
+        self.thread = None
+        # best move so far and the latest progress report
+        self.best_move = None
+        self.info = None
+
+    def _progress(self, info):
+        self.best_move = info['move']
+        self.info = info
+        if self.on_progress is not None:
+            self.on_progress(info)
+
+    def _run(self, time_limit, max_depth, node_limit):
+        minimax = self.minimax
+        try:
+            move = minimax.get_best_move(None, time_limit, max_depth, node_limit)
+            if move is not None:
+                self.best_move = move
+        finally:
+            minimax.stop_check = None
+            minimax.on_progress = None
+            self.done_event.set()
+
+    def stop(self):
+        """Ends the search at its next check; best_move stays playable."""
+        self.stop_event.set()
+
+    def done(self):
+        return self.done_event.is_set()
+
+    def wait(self, timeout=None):
+        """Waits for the search to end and returns the best move (so far, if timeout ran out)."""
+        self.done_event.wait(timeout)
+        return self.best_move
+
+
+# Worker process state of the parallel search: a Minimax kept across tasks, attached to the
+# parent's shared transposition table, the shared best root score, stop event and node count, and
+# the node limit and nodes already added to the shared count of the current task
+_worker_minimax = None
+_worker_alpha = None
+_worker_stop = None
+_worker_nodes = None
+_worker_node_limit = None
+_worker_reported = 0
+
+def _init_worker(shared_alpha, shared_stop, shared_nodes, tt_name, quiescence, null_move, lmr, see):
+    global _worker_minimax, _worker_alpha, _worker_stop, _worker_nodes
+    _worker_alpha = shared_alpha
+    _worker_stop = shared_stop
+    _worker_nodes = shared_nodes
+    _worker_minimax = Minimax(0, Position(), quiescence=quiescence, null_move=null_move, lmr=lmr, see=see,
+                              tt=SharedTranspositionTable(name=tt_name))
+    _worker_minimax.stop_check = _worker_should_stop
+
+def _report_worker_nodes():
+    """Adds the task's nodes since the last report to the shared count and returns the new total."""
+    global _worker_reported
+    searched = _worker_minimax.nodes + _worker_minimax.qnodes
+    with _worker_nodes.get_lock():
+        _worker_nodes.value += searched - _worker_reported
+        total = _worker_nodes.value
+    _worker_reported = searched
+    return total
+
+def _worker_should_stop():
+    # polled every 256 nodes, so every worker overshoots the node limit by a few hundred nodes at most
+    total = _report_worker_nodes()
+    return _worker_stop.is_set() or (_worker_node_limit is not None and total >= _worker_node_limit)
+
+def _search_root_moves(snapshot, packed_moves, depth, deadline, node_limit=None):
+    """Worker task: searches the given root moves of a Position.snapshot() to depth.
+
+    Returns (pid, counts, [(packed move, score)]), counts holding the task's WORKER_COUNTERS,
+    WORKER_TABLE_COUNTERS and cutoff_histogram; a move that does not beat the shared alpha only
+    gets an upper bound as its score. The results are None if the deadline ran out, the
+    workers searched node_limit nodes between them or the parent set the shared stop event.
+    """
+    global _worker_node_limit, _worker_reported
+    minimax = _worker_minimax
+    minimax.board = board = Position.from_snapshot(snapshot)
+    minimax._reset_search(deadline, new_search=False)
+    _worker_node_limit = node_limit
+    _worker_reported = 0
+    color = board.side_to_move
+    moves = {move.packed: move for move in board.get_all_possible_moves(COLOR_NAMES[color])}
+    results = []
+    try:
+        for packed in packed_moves:
+            # tasks too small to reach a node check inside the search would pass the node limit
+            if minimax._should_stop():
+                raise SearchTimeout()
+            alpha = _worker_alpha.value
+            board.make_move(moves[packed])
+            score = minimax._pvs_child(0 if alpha == float('-inf') else 1, depth - 1, alpha, float('inf'),
+                                       color ^ COLOR_MASK, 1)
+            board.undo_move()
+            with _worker_alpha.get_lock():
+                if score > _worker_alpha.value:
+                    _worker_alpha.value = score
+            results.append((packed, score))
+    except SearchTimeout:
+        results = None
+    _report_worker_nodes()
+    counts = {name: getattr(minimax, name) for name in WORKER_COUNTERS}
+    counts.update(tt_probes=minimax.tt.probes - minimax.tt_probes_start,
+                  tt_hits=minimax.tt.hits - minimax.tt_hits_start,
+                  pawn_probes=minimax.pawns.probes - minimax.pawn_probes_start,
+                  pawn_hits=minimax.pawns.hits - minimax.pawn_hits_start,
+                  cutoff_histogram=minimax.cutoff_histogram)
+    return os.getpid(), counts, results
+
+
+def _benchmark_positions(plies=(0, 8, 16, 24)):
+    """(board, side to move) at the given plies of one game played by a shallow search."""
+    positions = []
+    position = Position()
+    player = Minimax(2, position, quiescence=False)
+    for ply in range(max(plies) + 1):
+        if ply in plies:
+            positions.append((position.current_board, COLOR_NAMES[position.side_to_move]))
+        move = player.get_best_move()
+        if move is None:
+            break
+        position.make_move(move)
+    return positions
+
+
+def benchmark_pruning(depth=4, plies=(0, 8, 16, 24)):
+    """Searches positions from one self-played game to the given depth with null-move pruning and
+    late move reductions each on and off, and prints nodes and time per setting."""
+    positions = _benchmark_positions(plies)
+
+    settings = [('none', False, False), ('null move', True, False), ('lmr', False, True), ('both', True, True)]
+    for name, null_move, lmr in settings:
+        nodes = 0
+        elapsed = 0.0
+        for board, side in positions:
+            minimax = Minimax(depth, Position(board, side), null_move=null_move, lmr=lmr)
+            start = time.time()
+            minimax.get_best_move()
+            elapsed += time.time() - start
+            nodes += minimax.nodes + minimax.qnodes
+        print(f"{name:>10}: {nodes:>9} nodes {elapsed:8.2f} seconds {nodes / elapsed:8.0f} nodes per second")
+
+
+def benchmark_see(depth=4, plies=(0, 8, 16, 24), repeat=200):
+    """Times Position.see over every capture available after each move of the benchmark positions,
+    then searches them with static exchange evaluation on and off and prints nodes and time per setting."""
+    positions = _benchmark_positions(plies)
+    captures = []
+    for board, side in positions:
+        position = Position(board, side)
+        for move in position.get_all_possible_moves(side):
+            position.make_move(move)
+            reply = Position.from_snapshot(position.snapshot())
+            captures.extend((reply, capture) for capture in reply.get_all_captures(reply.current_player))
+            position.undo_move()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for position, move in captures:
+            position.see(move, PIECE_VALUES)
+    calls = repeat * len(captures)
+    elapsed = time.perf_counter() - start
+    print(f"see: {len(captures)} captures, {elapsed / calls * 1e6:.2f} microseconds per call" if calls else "see: no captures")
+
+    for name, see in (('without see', False), ('with see', True)):
+        nodes = 0
+        pruned = 0
+        elapsed = 0.0
+        for board, side in positions:
+            minimax = Minimax(depth, Position(board, side), see=see)
+            start = time.time()
+            minimax.get_best_move()
+            elapsed += time.time() - start
+            nodes += minimax.nodes + minimax.qnodes
+            pruned += minimax.see_pruned
+        print(f"{name:>12}: {nodes:>9} nodes {elapsed:8.2f} seconds {pruned:>7} captures pruned")
+
+
+def benchmark_parallel(depth=4, workers=None, plies=(0, 8, 16, 24)):
+    """Searches the benchmark positions with one process and with a pool of workers and prints the
+    speedup and how the nodes were spread over the workers."""
+    workers = workers or os.cpu_count()
+    positions = _benchmark_positions(plies)
+    parallel = Minimax(depth, Position(), workers=workers)
+    # start the worker processes outside the timings, with a throwaway search that imports
+    # everything they need; the table it filled is emptied again so serial and parallel start even
+    parallel.get_best_move(max_depth=1)
+    parallel.tt.clear()
+    serial_time = 0.0
+    parallel_time = 0.0
+    for board, side in positions:
+        serial = Minimax(depth, Position(board, side))
+        serial.get_best_move()
+        parallel.board = Position(board, side)
+        parallel.get_best_move()
+        serial_time += serial.search_time
+        parallel_time += parallel.search_time
+        stats = parallel.parallel_stats()
+        print(f"serial {serial.nodes + serial.qnodes:>8} nodes {serial.search_time:6.2f} seconds, "
+              f"parallel {parallel.nodes + parallel.qnodes:>8} nodes {parallel.search_time:6.2f} seconds, "
+              f"nodes per worker {stats['nodes_per_worker']}")
+    parallel.close()
+    print(f"{workers} workers: speedup {serial_time / parallel_time:.2f}")
+
+
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['benchmark']:
+        benchmark_pruning(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+        sys.exit()
+    if sys.argv[1:2] == ['see']:
+        benchmark_see(int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+        sys.exit()
+    if sys.argv[1:2] == ['parallel']:
+        benchmark_parallel(int(sys.argv[2]) if len(sys.argv) > 2 else 4, int(sys.argv[3]) if len(sys.argv) > 3 else None)
+        sys.exit()
+
+    import psutil
     start_time = time.time()
     start_memory = psutil.Process().memory_info().rss
 
-    board = ChessBoard()    
+    board = Position()
     minimax = Minimax(3, board)
     
     for i in range(20):
         white_calculation_start = time.time()
-        white_move, total_white_move = minimax.get_best_move_for_white()
+        white_move = minimax.get_best_move_for_white()
         white_calculation_end = time.time()
         board.make_move(white_move)
-        print(i, white_move, total_white_move)
+        print(i, white_move)
         print(f'White move calculation time: {white_calculation_end - white_calculation_start} seconds')
         
         black_calculation_start = time.time()
-        black_move, total_black_move = minimax.get_best_move_for_black()
+        black_move = minimax.get_best_move_for_black()
         black_calculation_end = time.time()
         board.make_move(black_move)
-        print(i, black_move, total_black_move)
+        print(i, black_move)
         print(f'Black move calculation time: {black_calculation_end - black_calculation_start} seconds')
         
     end_time = time.time()
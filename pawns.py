@@ -0,0 +1,94 @@
+from position import SQUARES, ROW_COL, WHITE, BLACK, PAWN, COLOR_MASK
+from array import array
+
+# Pawn-structure penalties in PIECE_VALUES units (a pawn is 10), for every pawn concerned
+DOUBLED_PAWN_PENALTY = 1.0
+ISOLATED_PAWN_PENALTY = 1.5
+
+# bytes per slot: key (8) + score (8)
+SLOT_BYTES = 16
+
+
+def pawn_structure(pieces, passed_values):
+    """White's pawn-structure score of the (piece code, row, col) triples in pieces.
+
+    Every doubled pawn (sharing its file with another of its colour) and every isolated pawn (no
+    pawn of its colour on a neighbouring file) is penalised; every passed pawn (no enemy pawn in
+    front of it on its own or a neighbouring file) earns passed_values[row][col] for white and the
+    same table mirrored for black.
+    """
+    pawns = {WHITE: [], BLACK: []}
+    for piece, row, col in pieces:
+        if piece == WHITE | PAWN or piece == BLACK | PAWN:
+            pawns[piece ^ PAWN].append((row, col))
+    score = 0.0
+    for color, sign, passed in ((WHITE, 1, passed_values), (BLACK, -1, passed_values[::-1])):
+        own = pawns[color]
+        theirs = pawns[color ^ COLOR_MASK]
+        # pawns per file, padded by an empty file on each side
+        files = [0] * 10
+        for row, col in own:
+            files[col + 1] += 1
+        for row, col in own:
+            term = 0.0
+            if files[col + 1] > 1:
+                term -= DOUBLED_PAWN_PENALTY
+            if not files[col] and not files[col + 2]:
+                term -= ISOLATED_PAWN_PENALTY
+            # white pawns run towards row 0, black ones towards row 7
+            if not any(abs(c - col) <= 1 and (r < row if color == WHITE else r > row) for r, c in theirs):
+                term += passed[row][col]
+            score += sign * term
+    return score
+
+
+class PawnHashTable():
+    """Pawn-structure evaluation cached by Position.pawn_key.
+
+    Pawns move far less often than pieces, so most positions of a search share their pawn
+    structure with many others and the score of pawn_structure() is looked up instead of worked
+    out again. Slots are always replaced and live in flat arrays sized like TranspositionTable's.
+    passed_values is the bonus table for white passed pawns, see pawn_structure().
+    """
+    def __init__(self, passed_values, size_mb=1):
+        self.passed_values = passed_values
+        self.size_mb = size_mb
+        self.size = max(1, int(size_mb * 1024 * 1024) // SLOT_BYTES)
+        self.clear()
+
+    def clear(self):
+        # key 0 (no pawns) matches the empty slots, whose score 0.0 is right for it
+        self.keys = array('Q', [0]) * self.size
+        self.scores = array('d', [0.0]) * self.size
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, position):
+        """White's pawn-structure score of position, from the table or computed and stored."""
+        self.probes += 1
+        key = position.pawn_key
+        slot = key % self.size
+        if self.keys[slot] == key:
+            self.hits += 1
+            return self.scores[slot]
+        score = self.evaluate(position.squares)
+        self.keys[slot] = key
+        self.scores[slot] = score
+        return score
+
+    def evaluate(self, squares):
+        """White's pawn-structure score of a Position.squares board, computed from scratch."""
+        return pawn_structure(((squares[sq],) + ROW_COL[sq] for sq in SQUARES), self.passed_values)
+
+    def evaluate_board_array(self, board):
+        """White's pawn-structure score of one evaluation.board_array() board, computed from scratch."""
+        return pawn_structure(((int(piece), bit >> 3, bit & 7) for bit, piece in enumerate(board)),
+                              self.passed_values)
+
+    def stats(self):
+        return {
+            'size_mb': self.size_mb,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
@@ -0,0 +1,133 @@
+from position import Position, COLOR_NAMES, ROW_COL, FEN_PIECES, TYPE_MASK
+from array import array
+import time
+
+# Standard perft positions with their node counts for depths 1-5
+PERFT_POSITIONS = [
+    ('start', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+     [20, 400, 8902, 197281, 4865609]),
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603, 193690690]),
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238, 674624]),
+    ('promotions', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333, 15833292]),
+    ('talkchess', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487, 89941194]),
+    ('middlegame', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+     [46, 2079, 89890, 3894594, 164075551]),
+]
+
+
+PROMOTION_LETTERS = {kind: letter for letter, kind in FEN_PIECES.items()}
+
+
+def move_name(move):
+    """Coordinate notation of a move, e.g. e2e4 or a7a8q."""
+    name = ''
+    for sq in (move.src, move.dst):
+        row, col = ROW_COL[sq]
+        name += 'abcdefgh'[col] + str(8 - row)
+    if move.promoted_piece:
+        name += PROMOTION_LETTERS[move.promoted_piece & TYPE_MASK]
+    return name
+
+
+def perft(position, depth):
+    """Number of leaf nodes of the legal move tree of the side to move, depth plies deep."""
+    moves = position.get_all_possible_moves(COLOR_NAMES[position.side_to_move])
+    # bulk counting: the last ply is only generated, never played
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1)
+        position.undo_move()
+    return nodes
+
+
+def divide(position, depth):
+    """perft of every legal move of the side to move, by move_name."""
+    counts = {}
+    for move in position.get_all_possible_moves(COLOR_NAMES[position.side_to_move]):
+        position.make_move(move)
+        counts[move_name(move)] = perft(position, depth - 1)
+        position.undo_move()
+    return counts
+
+
+class PerftTable():
+    """Always-replace cache of subtree counts keyed by Zobrist key and depth, in flat arrays."""
+    def __init__(self, size_mb=16):
+        # key (8) + count (8) + depth (1)
+        self.size = max(1, int(size_mb * 1024 * 1024) // 17)
+        self.keys = array('Q', [0]) * self.size
+        self.counts = array('Q', [0]) * self.size
+        self.depths = array('B', [0]) * self.size
+        self.hits = 0
+
+    def perft(self, position, depth):
+        """perft() that looks every subtree of depth 2 or more up in the table before walking it."""
+        if depth <= 1:
+            return perft(position, depth)
+        key = position.key
+        slot = key % self.size
+        if self.keys[slot] == key and self.depths[slot] == depth:
+            self.hits += 1
+            return self.counts[slot]
+        nodes = 0
+        for move in position.get_all_possible_moves(COLOR_NAMES[position.side_to_move]):
+            position.make_move(move)
+            nodes += self.perft(position, depth - 1)
+            position.undo_move()
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.counts[slot] = nodes
+        return nodes
+
+
+def run_suite(max_depth=4, movegen='mailbox', hashed=False, max_nodes=None):
+    """Checks every standard position up to max_depth (skipping counts above max_nodes) and prints
+    nodes per second. Returns True if all counts matched."""
+    passed = True
+    total_nodes = 0
+    total_time = 0.0
+    for name, fen, counts in PERFT_POSITIONS:
+        for depth, expected in enumerate(counts[:max_depth], 1):
+            if max_nodes is not None and expected > max_nodes:
+                break
+            position = Position.from_fen(fen, movegen)
+            start = time.time()
+            nodes = PerftTable().perft(position, depth) if hashed else perft(position, depth)
+            elapsed = time.time() - start
+            total_nodes += nodes
+            total_time += elapsed
+            status = 'ok' if nodes == expected else f'FAILED, expected {expected}'
+            passed = passed and nodes == expected
+            print(f"{name:>10} depth {depth}: {nodes:>10} nodes {elapsed:8.2f} seconds "
+                  f"{nodes / elapsed if elapsed else 0.0:10.0f} nodes per second {status}")
+    print(f"total: {total_nodes} nodes {total_time:.2f} seconds "
+          f"{total_nodes / total_time if total_time else 0.0:.0f} nodes per second")
+    return passed
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Perft counts and move generator speed.")
+    parser.add_argument('--depth', type=int, default=4, help="deepest depth to check, 1-5")
+    parser.add_argument('--movegen', default='mailbox', choices=['mailbox', 'bitboard'])
+    parser.add_argument('--hash', action='store_true', help="cache subtree counts by Zobrist key")
+    parser.add_argument('--max-nodes', type=int, help="skip counts above this many nodes")
+    parser.add_argument('--divide', metavar='FEN', help="print the count of every move of this position instead")
+    args = parser.parse_args()
+
+    if args.divide:
+        counts = divide(Position.from_fen(args.divide, args.movegen), args.depth)
+        for move in sorted(counts):
+            print(f"{move}: {counts[move]}")
+        print(f"moves: {len(counts)} nodes: {sum(counts.values())}")
+    else:
+        sys.exit(0 if run_suite(args.depth, args.movegen, args.hash, args.max_nodes) else 1)
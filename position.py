@@ -0,0 +1,753 @@
+import random
+
+# Board representation
+# The board is a flat 10x12 mailbox: the 8x8 playing area sits inside a border
+# of OFFBOARD squares, so a piece walking off the edge always lands on OFFBOARD
+# and no row/column bounds checks are needed. Square index = 21 + 10*row + col,
+# with row 0 being black's back rank like the old list-of-lists board.
+# Pieces are small ints: a colour bit or'ed with the piece type.
+EMPTY = 0
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = 1, 2, 3, 4, 5, 6
+WHITE, BLACK = 8, 16
+OFFBOARD = 32
+TYPE_MASK = 7
+COLOR_MASK = WHITE | BLACK
+
+COLORS = {'white': WHITE, 'black': BLACK}
+COLOR_NAMES = {WHITE: 'white', BLACK: 'black'}
+PIECE_TYPE_NAMES = ['', 'pawn', 'knight', 'bishop', 'rook', 'queen', 'king']
+
+# code -> 'white_pawn' and back; PIECE_CODES also maps codes to themselves so
+# either form can be passed wherever a piece is expected
+PIECE_NAMES = {EMPTY: ''}
+PIECE_CODES = {'': EMPTY, EMPTY: EMPTY}
+for _color, _color_name in COLOR_NAMES.items():
+    for _type in range(PAWN, KING + 1):
+        _code = _color | _type
+        PIECE_NAMES[_code] = _color_name + '_' + PIECE_TYPE_NAMES[_type]
+        PIECE_CODES[PIECE_NAMES[_code]] = _code
+        PIECE_CODES[_code] = _code
+
+# Piece-square values for the incremental scores, indexed [piece code][square]; all zero until
+# an evaluation is attached with Position.set_evaluation
+ZERO_PSQT = [[0.0] * 120 for _ in range(COLOR_MASK + KING + 1)]
+
+# Game phase: every knight and bishop on the board counts 1, rook 2, queen 4, so the starting
+# position has TOTAL_PHASE and bare kings and pawns 0
+TOTAL_PHASE = 24
+PHASE_WEIGHTS = [(0, 0, 1, 1, 2, 4, 0, 0)[code & TYPE_MASK] for code in range(COLOR_MASK + KING + 1)]
+
+# FEN letters: lower case for black, upper case for white
+FEN_PIECES = {'p': PAWN, 'n': KNIGHT, 'b': BISHOP, 'r': ROOK, 'q': QUEEN, 'k': KING}
+
+def square(row, col):
+    return 21 + 10 * row + col
+
+# the 64 playing squares in the same order as the old row/col scan
+SQUARES = [square(row, col) for row in range(8) for col in range(8)]
+ROW_COL = [None] * 120
+for _sq in SQUARES:
+    ROW_COL[_sq] = ((_sq // 10) - 2, (_sq % 10) - 1)
+# bitboard bit of each playing square (bit index 8*row + col, see bitboard.py), 0 off the board
+SQUARE_BITS = [0] * 120
+for _bit, _sq in enumerate(SQUARES):
+    SQUARE_BITS[_sq] = 1 << _bit
+
+KNIGHT_STEPS = (-21, -19, -12, -8, 8, 12, 19, 21)
+KING_STEPS = (-11, -10, -9, -1, 1, 9, 10, 11)
+BISHOP_STEPS = (-11, -9, 9, 11)
+ROOK_STEPS = (-10, -1, 1, 10)
+SLIDER_STEPS = {BISHOP: BISHOP_STEPS, ROOK: ROOK_STEPS, QUEEN: BISHOP_STEPS + ROOK_STEPS}
+# pawn step, capture steps, starting row, promotion row
+PAWN_RULES = {WHITE: (-10, (-9, -11), 6, 0), BLACK: (10, (11, 9), 1, 7)}
+PROMOTIONS = (ROOK, KNIGHT, BISHOP, QUEEN)
+# Zobrist keys: one random 64-bit number per piece code and square, the side to move,
+# each castling rights mask and each en passant square. The empty square and "no en
+# passant square" keys are 0 so they can be xor'ed in unconditionally.
+_random = random.Random(20240229)
+PIECE_KEYS = [[0] * 120 if code not in PIECE_NAMES or code == EMPTY else [_random.getrandbits(64) for _ in range(120)]
+              for code in range(COLOR_MASK + KING + 1)]
+SIDE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = [0] + [_random.getrandbits(64) for _ in range(15)]
+EP_KEYS = [0] + [_random.getrandbits(64) for _ in range(119)]
+# the pawn keys alone, zero for every other piece, for the pawn-structure key
+PAWN_KEYS = [PIECE_KEYS[code] if code & TYPE_MASK == PAWN else [0] * 120 for code in range(COLOR_MASK + KING + 1)]
+
+# row a pawn of the given colour captures en passant onto
+EP_ROWS = {WHITE: 2, BLACK: 5}
+
+# Castling rights bits
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING = 15
+# right, king from, king to, rook from, rook to, squares that must be empty, squares the king crosses
+CASTLING_RULES = {
+    WHITE: ((WHITE_KINGSIDE, 95, 97, 98, 96, (96, 97), (96, 97)),
+            (WHITE_QUEENSIDE, 95, 93, 91, 94, (92, 93, 94), (93, 94))),
+    BLACK: ((BLACK_KINGSIDE, 25, 27, 28, 26, (26, 27), (26, 27)),
+            (BLACK_QUEENSIDE, 25, 23, 21, 24, (22, 23, 24), (23, 24))),
+}
+# king destination -> (rook from, rook to)
+CASTLING_ROOKS = {rule[2]: (rule[3], rule[4]) for rules in CASTLING_RULES.values() for rule in rules}
+# rights that survive a move touching each square (king or rook leaving home, rook captured at home)
+CASTLING_MASK = [ALL_CASTLING] * 120
+for _rules in CASTLING_RULES.values():
+    for _right, _king_from, _, _rook_from, _, _, _ in _rules:
+        CASTLING_MASK[_king_from] &= ~_right
+        CASTLING_MASK[_rook_from] &= ~_right
+
+
+class Move():
+    __slots__ = ('src', 'dst', 'piece', 'side', 'special_move', 'promoted_piece')
+
+    def __init__(self, position, newPos, unitType, special_move = "", promoted = "") -> None:
+        # squares may be given as (row, col) or as mailbox indices, pieces as names or codes
+        self.src = square(*position) if type(position) is tuple else position
+        self.dst = square(*newPos) if type(newPos) is tuple else newPos
+        self.piece = PIECE_CODES[unitType]
+        self.side = 'white' if self.piece & WHITE else 'black'
+        self.special_move = special_move
+        self.promoted_piece = PIECE_CODES[promoted]
+
+    @property
+    def position(self):
+        return ROW_COL[self.src]
+    @property
+    def new_pos(self):
+        return ROW_COL[self.dst]
+    @property
+    def unit_type(self):
+        return PIECE_NAMES[self.piece]
+    @property
+    def promoted(self):
+        return PIECE_NAMES[self.promoted_piece]
+    @property
+    def packed(self):
+        # from, to and promotion in one int, e.g. for storing a move in a transposition table
+        return self.src | self.dst << 7 | self.promoted_piece << 14
+
+    def __str__(self) -> str:
+        return self.unit_type + ': ' +str(self.position) + "->" +  str(self.new_pos) + " - " + self.special_move + " - " + self.promoted
+
+
+class Position():
+    def __init__(self, current_board=None, current_player='white', movegen='mailbox'):
+        starting_board = [
+            ['black_rook', 'black_knight', 'black_bishop', 'black_queen', 'black_king', 'black_bishop', 'black_knight', 'black_rook'],
+            ['black_pawn'] * 8,
+            [''] * 8,
+            [''] * 8,
+            [''] * 8,
+            [''] * 8,
+            ['white_pawn'] * 8,
+            ['white_rook', 'white_knight', 'white_bishop', 'white_queen', 'white_king', 'white_bishop', 'white_knight', 'white_rook']
+        ]
+        if current_board is None:
+            current_board = starting_board
+        self.squares = bytearray([OFFBOARD]) * 120
+        self.current_player = current_player
+        # side to move as seen by make/undo; current_player is whose turn the game loop/GUI shows
+        self.side_to_move = COLORS[current_player]
+        self.blackCastled = False
+        self.whiteCastled = False
+        self.castling = 0
+        # square a pawn just skipped with a double step, 0 if none
+        self.ep_square = 0
+        # sums of the middlegame and endgame piece-square tables and of PHASE_WEIGHTS over the
+        # pieces on the board, kept up to date by make/undo
+        self.psqt = ZERO_PSQT
+        self.psqt_eg = ZERO_PSQT
+        self.score = 0.0
+        self.score_eg = 0.0
+        self.phase = 0
+        # one bitboard per piece code, kept by make/undo for the bitboard move generator only
+        self.bitboards = [0] * (COLOR_MASK + KING + 1) if movegen == 'bitboard' else None
+        self.current_board = current_board
+        # castling rights the pieces still have, assumed from where the kings and rooks stand
+        for _color, rules in CASTLING_RULES.items():
+            for right, king_from, _, rook_from, _, _, _ in rules:
+                if self.squares[king_from] == _color | KING and self.squares[rook_from] == _color | ROOK:
+                    self.castling |= right
+        self.key = self.compute_key()
+        # undo records, newest last:
+        # (move, moved unit, captured unit, last_move, blackCastled, whiteCastled, castling, ep_square, key,
+        #  score, score_eg, phase, pawn_key)
+        self.history = []
+        self.last_move = None
+
+        # Win/lose/draw
+        self.is_checkmated = None # None, 'white', 'black'
+        self.is_stalemated = None # None, 'white', 'black'
+
+        # move generator backend: 'mailbox' walks self.squares, 'bitboard' uses bitboard.BitboardGenerator
+        if movegen == 'mailbox':
+            self._generate_moves = self._mailbox_moves
+        elif movegen == 'bitboard':
+            from bitboard import BitboardGenerator
+            self._generate_moves = BitboardGenerator(self).get_all_possible_moves
+        else:
+            raise ValueError(f"Unknown move generator: {movegen}")
+        self.movegen = movegen
+
+    # The 8x8 list of piece names is only built for callers that display the board
+    @property
+    def current_board(self):
+        squares = self.squares
+        return [[PIECE_NAMES[squares[21 + 10 * row + col]] for col in range(8)] for row in range(8)]
+    @current_board.setter
+    def current_board(self, board):
+        for row in range(8):
+            for col in range(8):
+                self.squares[square(row, col)] = PIECE_CODES[board[row][col]]
+        self.key = self.compute_key()
+        self.pawn_key = self.compute_pawn_key()
+        self.score, self.score_eg, self.phase = self.compute_score()
+        if self.bitboards is not None:
+            self.bitboards = self.compute_bitboards()
+
+    def compute_key(self):
+        """Zobrist key of the position built from scratch; make/undo keep self.key equal to it."""
+        key = 0
+        for sq in SQUARES:
+            if self.squares[sq]:
+                key ^= PIECE_KEYS[self.squares[sq]][sq]
+        if self.side_to_move == BLACK:
+            key ^= SIDE_KEY
+        return key ^ CASTLING_KEYS[self.castling] ^ EP_KEYS[self.ep_square]
+
+    def compute_pawn_key(self):
+        """Zobrist key of the pawns alone; make/undo keep self.pawn_key equal to it."""
+        key = 0
+        for sq in SQUARES:
+            key ^= PAWN_KEYS[self.squares[sq]][sq]
+        return key
+
+    def compute_bitboards(self):
+        """Bitboards of every piece code built from scratch; make/undo keep self.bitboards equal to
+        them when the position uses the bitboard move generator."""
+        bitboards = [0] * (COLOR_MASK + KING + 1)
+        for sq in SQUARES:
+            if self.squares[sq]:
+                bitboards[self.squares[sq]] |= SQUARE_BITS[sq]
+        return bitboards
+
+    def compute_score(self):
+        """(score, score_eg, phase) built from scratch; make/undo keep the attributes equal to them."""
+        squares = self.squares
+        pieces = [(squares[sq], sq) for sq in SQUARES if squares[sq]]
+        return (sum(self.psqt[piece][sq] for piece, sq in pieces),
+                sum(self.psqt_eg[piece][sq] for piece, sq in pieces),
+                sum(PHASE_WEIGHTS[piece] for piece, _ in pieces))
+
+    def set_evaluation(self, psqt, psqt_eg=None):
+        """Makes make/undo keep score and score_eg as the sums of psqt[piece][square] and
+        psqt_eg[piece][square] over the board (psqt_eg defaults to psqt)."""
+        self.psqt = psqt
+        self.psqt_eg = psqt if psqt_eg is None else psqt_eg
+        self.score, self.score_eg, self.phase = self.compute_score()
+
+    def position_key(self):
+        """64-bit Zobrist key of pieces, side to move, castling rights and en passant square."""
+        return self.key
+
+    def snapshot(self):
+        """Compact, picklable copy of the position without its history, for sending to another process."""
+        return (bytes(self.squares), self.side_to_move, self.castling, self.ep_square,
+                self.blackCastled, self.whiteCastled, self.movegen)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        squares, side_to_move, castling, ep_square, blackCastled, whiteCastled, movegen = snapshot
+        position = cls(movegen=movegen)
+        position.squares[:] = squares
+        position.side_to_move = side_to_move
+        position.current_player = COLOR_NAMES[side_to_move]
+        position.castling = castling
+        position.ep_square = ep_square
+        position.blackCastled = blackCastled
+        position.whiteCastled = whiteCastled
+        position.key = position.compute_key()
+        position.pawn_key = position.compute_pawn_key()
+        position.score, position.score_eg, position.phase = position.compute_score()
+        if position.bitboards is not None:
+            position.bitboards = position.compute_bitboards()
+        return position
+
+    @classmethod
+    def from_fen(cls, fen, movegen='mailbox'):
+        """Position from Forsyth-Edwards Notation; the move counters are ignored."""
+        fields = fen.split()
+        position = cls(movegen=movegen)
+        squares = position.squares
+        for sq in SQUARES:
+            squares[sq] = EMPTY
+        for row, rank in enumerate(fields[0].split('/')):
+            col = 0
+            for letter in rank:
+                if letter.isdigit():
+                    col += int(letter)
+                else:
+                    squares[square(row, col)] = (WHITE if letter.isupper() else BLACK) | FEN_PIECES[letter.lower()]
+                    col += 1
+        position.side_to_move = WHITE if fields[1] == 'w' else BLACK
+        position.current_player = COLOR_NAMES[position.side_to_move]
+        position.castling = 0
+        for letter, right in zip('KQkq', (WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE)):
+            if letter in fields[2]:
+                position.castling |= right
+        position.ep_square = 0
+        if fields[3] != '-':
+            position.ep_square = square(8 - int(fields[3][1]), ord(fields[3][0]) - ord('a'))
+        position.key = position.compute_key()
+        position.pawn_key = position.compute_pawn_key()
+        position.score, position.score_eg, position.phase = position.compute_score()
+        if position.bitboards is not None:
+            position.bitboards = position.compute_bitboards()
+        return position
+
+    def get_board(self):
+        return (self.current_board, self.blackCastled, self.whiteCastled)
+
+    def _piece_targets(self, board, sq, piece):
+        """Squares the piece on sq can move to, ignoring whether its own king is left in check."""
+        targets = []
+        color = piece & COLOR_MASK
+        enemy = color ^ COLOR_MASK
+        kind = piece & TYPE_MASK
+        if kind == PAWN:
+            step, captures, start_row, _ = PAWN_RULES[color]
+            if board[sq + step] == EMPTY:
+                targets.append(sq + step)
+                if ROW_COL[sq][0] == start_row and board[sq + 2 * step] == EMPTY:
+                    targets.append(sq + 2 * step)
+            for capture in captures:
+                if board[sq + capture] & enemy:
+                    targets.append(sq + capture)
+        elif kind == KNIGHT or kind == KING:
+            for step in (KNIGHT_STEPS if kind == KNIGHT else KING_STEPS):
+                target = board[sq + step]
+                if target == EMPTY or target & enemy:
+                    targets.append(sq + step)
+        else:
+            for step in SLIDER_STEPS[kind]:
+                to = sq + step
+                target = board[to]
+                while target == EMPTY:
+                    targets.append(to)
+                    to += step
+                    target = board[to]
+                if target & enemy:
+                    targets.append(to)
+        return targets
+
+    def _impact(self, board, color):
+        impact = set()
+        for sq in SQUARES:
+            piece = board[sq]
+            if piece & color:
+                impact.update(self._piece_targets(board, sq, piece))
+        return impact
+
+    def get_all_impact(self, board=None):
+        if board is None:
+            board = self.squares
+        # [0] is for black, [1] is for white
+        return tuple([ROW_COL[sq] for sq in self._impact(board, color)] for color in (BLACK, WHITE))
+
+    def get_all_possible_moves(self,player: str = ['white', 'black']):
+        return self._generate_moves(player)
+
+    def get_all_captures(self, player: str = ['white', 'black']):
+        """Legal captures (en passant included) and promotions, e.g. for quiescence search."""
+        return self._generate_moves(player, True)
+
+    def _attack_map(self, board, color):
+        """Every square a piece of the given colour attacks, including squares of its own pieces."""
+        attacked = set()
+        for sq in SQUARES:
+            piece = board[sq]
+            if not piece & color:
+                continue
+            kind = piece & TYPE_MASK
+            if kind == PAWN:
+                for capture in PAWN_RULES[color][1]:
+                    attacked.add(sq + capture)
+            elif kind == KNIGHT:
+                for step in KNIGHT_STEPS:
+                    attacked.add(sq + step)
+            elif kind == KING:
+                for step in KING_STEPS:
+                    attacked.add(sq + step)
+            else:
+                for step in SLIDER_STEPS[kind]:
+                    to = sq + step
+                    while board[to] == EMPTY:
+                        attacked.add(to)
+                        to += step
+                    attacked.add(to)
+        return attacked
+
+    def _checks_and_pins(self, board, kingPos, color):
+        """Returns (checkers, evasion squares, pins) for the king of the given colour.
+
+        Evasion squares are the checker squares plus the squares between a sliding checker and the king;
+        pins maps a pinned piece's square to the squares it may still move to.
+        """
+        enemy = color ^ COLOR_MASK
+        checkers = []
+        evasions = set()
+        pins = {}
+        for step in KING_STEPS:
+            sliders = (QUEEN, BISHOP) if step in BISHOP_STEPS else (QUEEN, ROOK)
+            ray = []
+            blocker = 0
+            to = kingPos + step
+            while True:
+                piece = board[to]
+                if piece == EMPTY:
+                    ray.append(to)
+                elif piece & color and not blocker:
+                    blocker = to
+                else:
+                    if piece & enemy and piece & TYPE_MASK in sliders:
+                        ray.append(to)
+                        if blocker:
+                            pins[blocker] = set(ray)
+                        else:
+                            checkers.append(to)
+                            evasions.update(ray)
+                    break
+                to += step
+        for step in KNIGHT_STEPS:
+            if board[kingPos + step] == enemy | KNIGHT:
+                checkers.append(kingPos + step)
+                evasions.add(kingPos + step)
+        # an enemy pawn checks from the squares our own pawn would capture on
+        for capture in PAWN_RULES[color][1]:
+            if board[kingPos + capture] == enemy | PAWN:
+                checkers.append(kingPos + capture)
+                evasions.add(kingPos + capture)
+        return checkers, evasions, pins
+
+    def _mailbox_moves(self, player, captures_only=False):
+        # Legal moves straight from the position: checkers, pins and the squares the enemy attacks
+        # are worked out once, instead of trying every pseudo-legal move on a board copy.
+        board = self.squares
+        color = COLORS[player]
+        enemy = color ^ COLOR_MASK
+        step, captures, _, promotion_row = PAWN_RULES[color]
+        kingPos = board.find(color | KING)
+        checkers = []
+        evasions = None
+        pins = {}
+        danger = ()
+        if kingPos >= 0:
+            checkers, check_squares, pins = self._checks_and_pins(board, kingPos, color)
+            if checkers:
+                evasions = check_squares
+            # the king is lifted off the board so it cannot hide behind itself on a slider's line
+            board[kingPos] = EMPTY
+            if captures_only:
+                danger = [to for to in (kingPos + s for s in KING_STEPS)
+                          if board[to] & enemy and self.is_attacked(board, to, enemy)]
+            else:
+                danger = self._attack_map(board, enemy)
+            board[kingPos] = color | KING
+        double_check = len(checkers) > 1
+
+        movesList = []
+        for sq in SQUARES:
+            piece = board[sq]
+            if not piece & color:
+                continue
+            kind = piece & TYPE_MASK
+            if kind == KING:
+                for king_step in KING_STEPS:
+                    to = sq + king_step
+                    target = board[to]
+                    if (target & enemy or target == EMPTY and not captures_only) and to not in danger:
+                        movesList.append(Move(sq, to, piece))
+                if sq == kingPos and not checkers and not captures_only:
+                    for right, king_from, king_to, rook_from, _, empty, safe in CASTLING_RULES[color]:
+                        if (self.castling & right and sq == king_from and board[rook_from] == color | ROOK
+                                and not any(board[e] for e in empty) and not any(s in danger for s in safe)):
+                            movesList.append(Move(sq, king_to, piece, special_move="castle"))
+                continue
+            if double_check:
+                continue
+            allowed = pins.get(sq)
+            for to in self._piece_targets(board, sq, piece):
+                if evasions is not None and to not in evasions:
+                    continue
+                if allowed is not None and to not in allowed:
+                    continue
+                if kind == PAWN and ROW_COL[to][0] == promotion_row:
+                    for pr in PROMOTIONS:
+                        movesList.append(Move(sq, to, piece, special_move="promote", promoted=color | pr))
+                elif board[to] or not captures_only:
+                    movesList.append(Move(sq, to, piece))
+
+        # en passant removes a pawn off the capture square, which the masks above don't describe
+        # (e.g. both pawns leaving the king's rank), so the rare candidate is just tried on the board
+        ep = self.ep_square
+        if ep and ROW_COL[ep][0] == EP_ROWS[color] and not double_check:
+            for capture in captures:
+                if board[ep - capture] == color | PAWN:
+                    mv = Move(ep - capture, ep, color | PAWN, special_move="en_passant")
+                    self.make_move(mv)
+                    if not self.isCheck(None, player):
+                        movesList.append(mv)
+                    self.undo_move()
+        return movesList
+
+    def make_move(self,move: Move):
+        board = self.squares
+        src, dst = move.src, move.dst
+        unit = board[src]
+        captured = board[dst]
+        castling = self.castling
+        key = self.key
+        psqt = self.psqt
+        psqt_eg = self.psqt_eg
+        score = self.score
+        score_eg = self.score_eg
+        self.history.append((move, unit, captured, self.last_move, self.blackCastled, self.whiteCastled,
+                             castling, self.ep_square, key, score, score_eg, self.phase, self.pawn_key))
+        self.last_move = move
+        placed = move.promoted_piece or unit
+        board[src] = EMPTY
+        board[dst] = placed
+        key ^= PIECE_KEYS[unit][src] ^ PIECE_KEYS[placed][dst] ^ PIECE_KEYS[captured][dst] ^ EP_KEYS[self.ep_square] ^ SIDE_KEY
+        score += psqt[placed][dst] - psqt[unit][src] - psqt[captured][dst]
+        score_eg += psqt_eg[placed][dst] - psqt_eg[unit][src] - psqt_eg[captured][dst]
+        if captured or placed != unit:
+            self.phase += PHASE_WEIGHTS[placed] - PHASE_WEIGHTS[unit] - PHASE_WEIGHTS[captured]
+        if unit & TYPE_MASK == PAWN or captured & TYPE_MASK == PAWN:
+            self.pawn_key ^= PAWN_KEYS[unit][src] ^ PAWN_KEYS[placed][dst] ^ PAWN_KEYS[captured][dst]
+        self.ep_square = 0
+        if unit & TYPE_MASK == PAWN:
+            if dst - src == 20 or src - dst == 20:
+                self.ep_square = (src + dst) // 2
+                key ^= EP_KEYS[self.ep_square]
+            elif move.special_move == "en_passant":
+                captured_sq = dst - PAWN_RULES[unit & COLOR_MASK][0]
+                key ^= PIECE_KEYS[board[captured_sq]][captured_sq]
+                self.pawn_key ^= PAWN_KEYS[board[captured_sq]][captured_sq]
+                score -= psqt[board[captured_sq]][captured_sq]
+                score_eg -= psqt_eg[board[captured_sq]][captured_sq]
+                board[captured_sq] = EMPTY
+        elif move.special_move == "castle":
+            rook_from, rook_to = CASTLING_ROOKS[dst]
+            rook = board[rook_from]
+            board[rook_to] = rook
+            board[rook_from] = EMPTY
+            key ^= PIECE_KEYS[rook][rook_from] ^ PIECE_KEYS[rook][rook_to]
+            score += psqt[rook][rook_to] - psqt[rook][rook_from]
+            score_eg += psqt_eg[rook][rook_to] - psqt_eg[rook][rook_from]
+            if unit & WHITE:
+                self.whiteCastled = True
+            else:
+                self.blackCastled = True
+        if self.bitboards is not None:
+            self._toggle_bitboards(move, unit, placed, captured)
+        self.score = score
+        self.score_eg = score_eg
+        self.castling = castling & CASTLING_MASK[src] & CASTLING_MASK[dst]
+        self.key = key ^ CASTLING_KEYS[castling] ^ CASTLING_KEYS[self.castling]
+        self.side_to_move ^= COLOR_MASK
+
+    def make_null_move(self):
+        """Passes the turn without moving, for null-move pruning; undone by undo_move like any other move."""
+        self.history.append((None, EMPTY, EMPTY, self.last_move, self.blackCastled, self.whiteCastled,
+                             self.castling, self.ep_square, self.key, self.score, self.score_eg, self.phase,
+                             self.pawn_key))
+        self.key ^= EP_KEYS[self.ep_square] ^ SIDE_KEY
+        self.ep_square = 0
+        self.side_to_move ^= COLOR_MASK
+
+    def undo_move(self):
+        if not self.history:
+            return
+        (move, unit, captured, self.last_move, self.blackCastled, self.whiteCastled,
+         self.castling, self.ep_square, self.key, self.score, self.score_eg, self.phase,
+         self.pawn_key) = self.history.pop()
+        self.side_to_move ^= COLOR_MASK
+        if move is None:
+            return
+        board = self.squares
+        board[move.src] = unit
+        board[move.dst] = captured
+        if move.special_move == "en_passant":
+            board[move.dst - PAWN_RULES[unit & COLOR_MASK][0]] = unit ^ COLOR_MASK
+        elif move.special_move == "castle":
+            rook_from, rook_to = CASTLING_ROOKS[move.dst]
+            board[rook_from] = board[rook_to]
+            board[rook_to] = EMPTY
+        if self.bitboards is not None:
+            self._toggle_bitboards(move, unit, move.promoted_piece or unit, captured)
+
+    def _toggle_bitboards(self, move, unit, placed, captured):
+        """Plays move on self.bitboards, or takes it back: every change is an XOR, so the same
+        call does both."""
+        bitboards = self.bitboards
+        dst_bit = SQUARE_BITS[move.dst]
+        bitboards[unit] ^= SQUARE_BITS[move.src]
+        bitboards[placed] ^= dst_bit
+        if captured:
+            bitboards[captured] ^= dst_bit
+        if move.special_move == "en_passant":
+            bitboards[unit ^ COLOR_MASK] ^= SQUARE_BITS[move.dst - PAWN_RULES[unit & COLOR_MASK][0]]
+        elif move.special_move == "castle":
+            rook_from, rook_to = CASTLING_ROOKS[move.dst]
+            bitboards[(unit & COLOR_MASK) | ROOK] ^= SQUARE_BITS[rook_from] | SQUARE_BITS[rook_to]
+
+    def impact_pos(self,unitType,pos):
+        return [ROW_COL[sq] for sq in self._piece_targets(self.squares, square(*pos), PIECE_CODES[unitType])]
+
+    def is_attacked(self, board, sq, color):
+        """True if a piece of the given colour attacks sq."""
+        for step in KNIGHT_STEPS:
+            if board[sq + step] == color | KNIGHT:
+                return True
+        for step in KING_STEPS:
+            if board[sq + step] == color | KING:
+                return True
+        # an enemy pawn attacks sq from the squares it would capture from
+        for capture in PAWN_RULES[color][1]:
+            if board[sq - capture] == color | PAWN:
+                return True
+        for kinds, steps in (((BISHOP, QUEEN), BISHOP_STEPS), ((ROOK, QUEEN), ROOK_STEPS)):
+            for step in steps:
+                to = sq + step
+                while board[to] == EMPTY:
+                    to += step
+                if board[to] & color and board[to] & TYPE_MASK in kinds:
+                    return True
+        return False
+
+    def _least_valuable_attacker(self, board, sq, color):
+        """Square of the least valuable piece of the given colour attacking sq, 0 if none."""
+        for capture in PAWN_RULES[color][1]:
+            if board[sq - capture] == color | PAWN:
+                return sq - capture
+        for step in KNIGHT_STEPS:
+            if board[sq + step] == color | KNIGHT:
+                return sq + step
+        # the nearest piece along every ray, the cheapest slider among them wins
+        best = 0
+        best_kind = KING
+        for kinds, steps in (((BISHOP, QUEEN), BISHOP_STEPS), ((ROOK, QUEEN), ROOK_STEPS)):
+            for step in steps:
+                to = sq + step
+                while board[to] == EMPTY:
+                    to += step
+                piece = board[to]
+                if piece & color and piece & TYPE_MASK in kinds and piece & TYPE_MASK < best_kind:
+                    best = to
+                    best_kind = piece & TYPE_MASK
+        if best:
+            return best
+        for step in KING_STEPS:
+            if board[sq + step] == color | KING:
+                return sq + step
+        return 0
+
+    def see(self, move, values):
+        """Static exchange evaluation: the material the side to move nets by playing the capture move
+        and then trading on its destination square with the least valuable piece each time, either
+        side being free to stop. values gives the material of each piece type.
+
+        Attackers are found by scanning out from the square like is_attacked, and every piece that
+        has taken part is lifted off the board, so sliders behind it join in (x-rays). Pins,
+        checks and promotions past the first move are not considered.
+        """
+        board = self.squares
+        sq = move.dst
+        unit = board[move.src]
+        gains = [values[PAWN if move.special_move == "en_passant" else board[sq] & TYPE_MASK]]
+        on_square = unit
+        if move.promoted_piece:
+            gains[0] += values[move.promoted_piece & TYPE_MASK] - values[PAWN]
+            on_square = move.promoted_piece
+        lifted = [(move.src, unit)]
+        if move.special_move == "en_passant":
+            captured_sq = sq - PAWN_RULES[unit & COLOR_MASK][0]
+            lifted.append((captured_sq, board[captured_sq]))
+            board[captured_sq] = EMPTY
+        board[move.src] = EMPTY
+        color = (unit & COLOR_MASK) ^ COLOR_MASK
+        while True:
+            attacker_sq = self._least_valuable_attacker(board, sq, color)
+            if not attacker_sq:
+                break
+            attacker = board[attacker_sq]
+            # a king may only take back if nothing would take it in turn
+            if attacker & TYPE_MASK == KING and self._least_valuable_attacker(board, sq, color ^ COLOR_MASK):
+                break
+            gains.append(values[on_square & TYPE_MASK] - gains[-1])
+            on_square = attacker
+            lifted.append((attacker_sq, attacker))
+            board[attacker_sq] = EMPTY
+            color ^= COLOR_MASK
+        for lifted_sq, piece in lifted:
+            board[lifted_sq] = piece
+        # from the last capture back: each side only captures if that does not lose material
+        for index in range(len(gains) - 1, 0, -1):
+            gains[index - 1] = -max(-gains[index - 1], gains[index])
+        return gains[0]
+
+    def isCheck(self, board=None, player:str =['white','black'], ):
+        if board is None:
+            board = self.squares
+        color = COLORS[player]
+        kingPos = board.find(color | KING)
+        if kingPos < 0:
+            return False
+        return self.is_attacked(board, kingPos, color ^ COLOR_MASK)
+
+    def isCheckMate(self,player:str=['white','black']):
+        if not self.isCheck(None, player):
+            return False
+        if self.get_all_possible_moves(player):
+            return False
+        if player == "white":
+            self.is_checkmated = "white"
+        else:
+            self.is_checkmated = "black"
+        return True
+
+
+    def is_draw(self,player: str = ['white', 'black']):
+        if player =="white":
+            res = self.get_all_possible_moves("white")
+            if len(res) == 0 and not self.isCheck(None, player):
+                self.is_stalemated = 'white'
+                return True
+            return False
+        if player == "black":
+            res = self.get_all_possible_moves("black")
+            if len(res) == 0 and not self.isCheck(None, player):
+                self.is_stalemated = 'black'
+                return True
+            return False
+
+    def is_game_over(self):
+        self.isCheckMate("white")
+        self.isCheckMate("black")
+        self.is_draw("white")
+        self.is_draw("black")
+
+        if self.is_checkmated:
+            print(f"{self.is_checkmated} is checkmated")
+            return True
+        if self.is_stalemated:
+            print(f"{self.is_stalemated} is stalemated")
+            return True
+        return False
+
+    def get_winner(self):
+        if self.is_checkmated == "white":
+            return "black"
+        if self.is_checkmated == "black":
+            return "white"
+        if self.is_stalemated:
+            return "draw"
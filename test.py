@@ -0,0 +1,307 @@
+import random
+import time
+import unittest
+
+from position import Position, COLOR_NAMES, TOTAL_PHASE, WHITE, BLACK, PAWN
+from perft import PERFT_POSITIONS, PerftTable, perft, divide, move_name
+from minimax import Minimax, PIECE_VALUES
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, UPPER
+from pawns import pawn_structure, DOUBLED_PAWN_PENALTY, ISOLATED_PAWN_PENALTY
+
+# counts above this are left to `python perft.py --depth 5`, which takes minutes
+MAX_TEST_NODES = 500000
+
+# the search checks its node limit every 256 main search or quiescence nodes, so a search (or
+# each worker of a parallel one) may go this far past it
+NODE_LIMIT_SLACK = 2 * 256
+
+
+class PerftTest(unittest.TestCase):
+    """Move generation and make/undo checked against the known perft counts."""
+
+    def check_counts(self, movegen, count=perft):
+        for name, fen, counts in PERFT_POSITIONS:
+            for depth, expected in enumerate(counts, 1):
+                if expected > MAX_TEST_NODES:
+                    break
+                with self.subTest(position=name, depth=depth):
+                    self.assertEqual(count(Position.from_fen(fen, movegen), depth), expected)
+
+    def test_mailbox(self):
+        self.check_counts('mailbox')
+
+    def test_bitboard(self):
+        self.check_counts('bitboard')
+
+    def test_hashed(self):
+        self.check_counts('mailbox', lambda position, depth: PerftTable(1).perft(position, depth))
+
+    def test_divide_sums_to_perft(self):
+        name, fen, counts = PERFT_POSITIONS[1]
+        self.assertEqual(sum(divide(Position.from_fen(fen), 3).values()), counts[2])
+
+    def test_make_undo_keeps_bitboards(self):
+        for name, fen, counts in PERFT_POSITIONS:
+            position = Position.from_fen(fen, 'bitboard')
+            before = list(position.bitboards)
+            for move in position.get_all_possible_moves(COLOR_NAMES[position.side_to_move]):
+                position.make_move(move)
+                self.assertEqual(position.bitboards, position.compute_bitboards(), f"{name} {move}")
+                position.undo_move()
+                self.assertEqual(position.bitboards, before, f"{name} {move}")
+
+    def test_make_undo_restores_position(self):
+        for name, fen, counts in PERFT_POSITIONS:
+            position = Position.from_fen(fen)
+            before = (bytes(position.squares), position.castling, position.ep_square, position.key)
+            for move in position.get_all_possible_moves(COLOR_NAMES[position.side_to_move]):
+                position.make_move(move)
+                self.assertEqual(position.key, position.compute_key(), f"{name} {move}")
+                self.assertEqual(position.pawn_key, position.compute_pawn_key(), f"{name} {move}")
+                position.undo_move()
+                self.assertEqual((bytes(position.squares), position.castling, position.ep_square, position.key), before)
+
+
+class EvaluationTest(unittest.TestCase):
+    """The scores and game phase make/undo keep against a full evaluation of the board."""
+
+    def test_incremental_score(self):
+        rng = random.Random(0)
+        for name, fen, counts in PERFT_POSITIONS:
+            position = Position.from_fen(fen)
+            minimax = Minimax(1, position)
+            for ply in range(40):
+                moves = position.get_all_possible_moves(COLOR_NAMES[position.side_to_move])
+                if not moves:
+                    break
+                position.make_move(rng.choice(moves))
+                full = minimax._evaluate_board(position.squares)
+                self.assertAlmostEqual(minimax._evaluate(), full, msg=f"{name} ply {ply}")
+                self.assertAlmostEqual(minimax._evaluate_board_by_squares(position.squares), full, msg=f"{name} ply {ply}")
+            while position.history:
+                position.undo_move()
+                for kept, computed in zip((position.score, position.score_eg, position.phase), position.compute_score()):
+                    self.assertAlmostEqual(kept, computed, msg=name)
+
+    def test_phase(self):
+        self.assertEqual(Position().phase, TOTAL_PHASE)
+        # kings and pawns only: the endgame tables alone decide, so the centralised king scores higher
+        minimax = Minimax(1, Position.from_fen('8/4k3/8/8/3K4/8/4P3/8 w - - 0 1'))
+        self.assertEqual(minimax.board.phase, 0)
+        self.assertAlmostEqual(minimax._evaluate(), minimax.board.score_eg + minimax.pawns.evaluate(minimax.board.squares))
+        corner = Minimax(1, Position.from_fen('8/4k3/8/8/8/8/4P3/K7 w - - 0 1'))
+        self.assertGreater(minimax._evaluate(), corner._evaluate())
+
+
+class PawnHashTest(unittest.TestCase):
+    """Pawn-structure terms and their cache."""
+
+    def test_structure_terms(self):
+        passed = [[float(8 - row)] * 8 for row in range(8)]
+        # white: doubled and isolated pawns on the a-file, passed pawn on d5; black: passed h-pawn
+        pieces = [(WHITE | PAWN, 6, 0), (WHITE | PAWN, 5, 0), (WHITE | PAWN, 3, 3), (BLACK | PAWN, 1, 1),
+                  (BLACK | PAWN, 4, 7)]
+        white = 2 * (-DOUBLED_PAWN_PENALTY - ISOLATED_PAWN_PENALTY) - ISOLATED_PAWN_PENALTY + passed[3][3]
+        black = -ISOLATED_PAWN_PENALTY - ISOLATED_PAWN_PENALTY + passed[::-1][4][7]
+        self.assertAlmostEqual(pawn_structure(pieces, passed), white - black)
+
+    def test_cached_scores(self):
+        rng = random.Random(1)
+        position = Position()
+        minimax = Minimax(1, position)
+        pawns = minimax.pawns
+        for ply in range(60):
+            moves = position.get_all_possible_moves(COLOR_NAMES[position.side_to_move])
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+            for _ in range(2):
+                self.assertEqual(pawns.probe(position), pawns.evaluate(position.squares), f"ply {ply}")
+        self.assertGreaterEqual(pawns.hits, pawns.probes / 2)
+        self.assertEqual(pawns.stats()['hit_rate'], pawns.hits / pawns.probes)
+
+    def test_search_stats(self):
+        minimax = Minimax(3, Position())
+        minimax.get_best_move(True)
+        stats = minimax.search_stats()
+        self.assertGreater(stats['pawn_probes'], 0)
+        self.assertGreater(stats['pawn_hit_rate'], 0.5)
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """Replacement policy of the transposition table."""
+
+    def check_old_generation_is_replaced(self, tt):
+        deep, shallow = 1, 1 + tt.buckets
+        tt.store(deep, 8, EXACT, 1.0)
+        tt.store(shallow, 1, EXACT, 2.0)
+        # same search: the deep entry keeps the first slot, the shallow one takes the second
+        self.assertEqual(tt.probe(deep)[0], 8)
+        tt.new_search()
+        tt.store(1 + 2 * tt.buckets, 1, UPPER, 3.0)
+        self.assertIsNone(tt.probe(deep))
+        self.assertEqual(tt.probe(1 + 2 * tt.buckets)[1:3], (UPPER, 3.0))
+
+    def test_old_generation_is_replaced(self):
+        self.check_old_generation_is_replaced(TranspositionTable(0.001))
+
+    def test_shared_old_generation_is_replaced(self):
+        tt = SharedTranspositionTable(0.001)
+        try:
+            self.check_old_generation_is_replaced(tt)
+        finally:
+            tt.close()
+
+    def test_size(self):
+        tt = TranspositionTable(1)
+        self.assertLessEqual(sum(len(table) * table.itemsize for table in
+                                 (tt.keys, tt.scores, tt.moves, tt.depths, tt.bounds, tt.generations)), 1024 * 1024)
+
+    def test_ponder_keeps_generation(self):
+        # a table small enough for the next search to overwrite whatever it may replace
+        minimax = Minimax(3, Position(), tt_size_mb=0.002)
+        generation = minimax.tt.generation
+        minimax.ponder(lambda: False, max_depth=2)
+        self.assertEqual(minimax.tt.generation, generation + 1)
+        board = minimax.board
+        # the expected reply is the only one pondered at the full depth
+        pondered = {}
+        for reply in board.get_all_possible_moves(COLOR_NAMES[board.side_to_move]):
+            board.make_move(reply)
+            entry = minimax.tt.probe(board.position_key())
+            if entry is not None:
+                pondered[entry[0]] = pondered.get(entry[0], []) + [(reply, board.position_key())]
+            board.undo_move()
+        self.assertEqual(len(pondered[2]), 1)
+        # another reply is played: its search must not give up the expected reply's entry
+        board.make_move(pondered[1][0][0])
+        minimax.get_best_move(max_depth=2)
+        self.assertEqual(minimax.tt.generation, generation + 1)
+        self.assertEqual(minimax.tt.probe(pondered[2][0][1])[0], 2)
+
+    def test_parallel_needs_shared_table(self):
+        with self.assertRaises(ValueError):
+            Minimax(2, Position(), workers=2, tt=TranspositionTable(1))
+
+
+class SearchControlTest(unittest.TestCase):
+    """Stopping, node limits and progress reports of a running search."""
+
+    def check_stop(self, minimax):
+        legal = [move.packed for move in minimax.board.get_all_possible_moves(COLOR_NAMES[minimax.board.side_to_move])]
+        handle = minimax.start_search(max_depth=30)
+        time.sleep(0.2)
+        start = time.time()
+        handle.stop()
+        move = handle.wait(5)
+        self.assertTrue(handle.done())
+        self.assertLess(time.time() - start, 1)
+        self.assertIn(move.packed, legal)
+
+    def check_node_limit(self, minimax, slack):
+        for limit in (1000, 3000, 10000):
+            with self.subTest(node_limit=limit):
+                minimax.tt.clear()
+                minimax.get_best_move(max_depth=30, node_limit=limit)
+                self.assertLessEqual(minimax.nodes + minimax.qnodes, limit + slack)
+
+    def test_stop(self):
+        self.check_stop(Minimax(3, Position()))
+
+    def test_node_limit(self):
+        self.check_node_limit(Minimax(3, Position()), NODE_LIMIT_SLACK)
+
+    def test_parallel_stop(self):
+        minimax = Minimax(3, Position(), workers=2)
+        try:
+            self.check_stop(minimax)
+        finally:
+            minimax.close()
+
+    def test_parallel_node_limit(self):
+        minimax = Minimax(3, Position(), workers=2)
+        try:
+            self.check_node_limit(minimax, minimax.workers * NODE_LIMIT_SLACK)
+        finally:
+            minimax.close()
+
+    def test_progress_per_depth(self):
+        infos = []
+        handle = Minimax(3, Position()).start_search(max_depth=3, on_progress=infos.append)
+        handle.wait(30)
+        self.assertEqual([info['depth'] for info in infos if info['completed']], [1, 2, 3])
+        self.assertEqual(handle.best_move, infos[-1]['move'])
+
+
+class ParallelSearchTest(unittest.TestCase):
+    """The root search split over worker processes against the serial search."""
+
+    def setUp(self):
+        self.parallel = Minimax(3, Position(), workers=2, null_move=False, lmr=False)
+
+    def tearDown(self):
+        # shuts the pool down and frees the shared table
+        self.parallel.close()
+
+    def test_same_score_as_serial(self):
+        for name, fen, counts in PERFT_POSITIONS[:3]:
+            with self.subTest(position=name):
+                serial = Minimax(3, Position.from_fen(fen), null_move=False, lmr=False)
+                serial.get_best_move()
+                self.parallel.board = Position.from_fen(fen)
+                self.parallel.tt.clear()
+                self.parallel.get_best_move()
+                self.assertEqual(self.parallel.completed_depth, 3)
+                self.assertAlmostEqual(self.parallel.best_score, serial.best_score)
+
+    def test_worker_stats(self):
+        self.parallel.get_best_move()
+        stats = self.parallel.search_stats()
+        self.assertGreater(stats['cutoffs'], 0)
+        self.assertEqual(sum(stats['cutoff_histogram']), stats['cutoffs'])
+        self.assertGreaterEqual(stats['tt_probes'], stats['nodes'])
+        self.assertGreater(stats['tt_hits'], 0)
+        self.assertGreater(stats['pawn_probes'], 0)
+
+
+# (FEN, capture, expected static exchange in PIECE_VALUES units)
+SEE_CASES = [
+    ('1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1', 'e1e5', 10),
+    ('1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1', 'd3e5', -20),
+    # the second black rook behind the first decides the exchange (x-ray)
+    ('4r1k1/4r3/8/4p3/8/8/4R3/4R1K1 w - - 0 1', 'e2e5', -40),
+    ('4r1k1/8/8/4p3/8/8/4R3/4R1K1 w - - 0 1', 'e2e5', 10),
+    ('6k1/8/8/3p4/4N3/8/8/6K1 b - - 0 1', 'd5e4', 30),
+    ('6k1/8/4p3/3p4/8/8/3Q4/6K1 w - - 0 1', 'd2d5', -80),
+    # the king may not take back on a square the bishop guards
+    ('8/8/4k3/3p4/8/5B2/3R4/6K1 w - - 0 1', 'd2d5', 10),
+    ('8/8/4k3/3p4/8/8/3R4/6K1 w - - 0 1', 'd2d5', -40),
+    ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'e5d6', 10),
+    ('3r2k1/1P6/8/8/8/8/8/6K1 w - - 0 1', 'b7b8q', -10),
+]
+
+
+class SeeTest(unittest.TestCase):
+    """Static exchange evaluation against hand-worked exchanges."""
+
+    def test_exchanges(self):
+        for fen, name, expected in SEE_CASES:
+            with self.subTest(fen=fen, move=name):
+                position = Position.from_fen(fen)
+                squares = bytes(position.squares)
+                move = next(move for move in position.get_all_possible_moves(COLOR_NAMES[position.side_to_move])
+                            if move_name(move) == name)
+                self.assertEqual(position.see(move, PIECE_VALUES), expected)
+                self.assertEqual(bytes(position.squares), squares)
+
+    def test_quiescence_pruning(self):
+        # Qxd5 loses the queen for a pawn: quiescence skips it and stands pat instead
+        minimax = Minimax(1, Position.from_fen(SEE_CASES[5][0]))
+        minimax._reset_search(None)
+        minimax._quiescence(float('-inf'), float('inf'), WHITE, 0)
+        self.assertEqual(minimax.see_pruned, 1)
+        self.assertEqual(minimax.qnodes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
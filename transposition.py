@@ -0,0 +1,172 @@
+from array import array
+from multiprocessing import shared_memory
+import struct
+
+# Bound types of a stored score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# array type codes of a slot: key, score, move, depth, bound, generation
+SLOT_TYPECODES = ('Q', 'd', 'I', 'b', 'B', 'B')
+SLOT_BYTES = sum(array(code).itemsize for code in SLOT_TYPECODES)
+
+# Shared table slots are three 64-bit words: key ^ score bits ^ info, score bits, info, where
+# info packs move (bits 0-31), depth (bits 32-39), bound (bits 40-47) and generation (bits 48-55).
+# The slots follow one header word holding the current search generation.
+SHARED_HEADER_WORDS = 1
+SHARED_SLOT_WORDS = 3
+SHARED_SLOT_BYTES = 8 * SHARED_SLOT_WORDS
+_DOUBLE = struct.Struct('d')
+_WORD = struct.Struct('Q')
+
+
+class TranspositionTable():
+    """Fixed-size table of search results keyed by Position.position_key().
+
+    The table is split into buckets of two slots. The first slot keeps the deepest
+    result seen for the bucket (depth-preferred), the second always takes the newest
+    store that did not go into the first, so fresh shallow results still get cached.
+    Every slot remembers the search generation that stored it; new_search() starts a new
+    one, and a first slot left by an older search is replaced whatever its depth, so deep
+    results of positions the game has left behind do not hold the table for good.
+    Slots live in flat arrays, so the memory used is fixed by size_mb up front.
+    """
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+        self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * SLOT_BYTES))
+        slots = 2 * self.buckets
+        self.keys = array('Q', [0]) * slots
+        self.scores = array('d', [0.0]) * slots
+        self.moves = array('I', [0]) * slots
+        self.depths = array('b', [0]) * slots
+        self.bounds = array('B', [0]) * slots
+        self.generations = array('B', [0]) * slots
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self):
+        slots = 2 * self.buckets
+        self.keys = array('Q', [0]) * slots
+        self.depths = array('b', [0]) * slots
+        self.generations = array('B', [0]) * slots
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Starts a new search generation, making the entries stored so far replaceable."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """Returns (depth, bound, score, packed move) stored for key, or None."""
+        self.probes += 1
+        slot = (key % self.buckets) << 1
+        keys = self.keys
+        if keys[slot] != key:
+            slot += 1
+            if keys[slot] != key:
+                return None
+        self.hits += 1
+        return self.depths[slot], self.bounds[slot], self.scores[slot], self.moves[slot]
+
+    def store(self, key, depth, bound, score, move=0):
+        self.stores += 1
+        slot = (key % self.buckets) << 1
+        if self.keys[slot] != key and depth < self.depths[slot] and self.generations[slot] == self.generation:
+            slot += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.scores[slot] = score
+        self.moves[slot] = move
+        self.generations[slot] = self.generation
+
+    def stats(self):
+        return {
+            'size_mb': self.size_mb,
+            'probes': self.probes,
+            'hits': self.hits,
+            'stores': self.stores,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
+
+
+class SharedTranspositionTable():
+    """TranspositionTable kept in a multiprocessing.shared_memory block, so every search
+    process of a game reads and writes the same entries.
+
+    Without a name a new block of size_mb is created; with the name of an existing block
+    the table attaches to it, so the memory used does not grow with the number of processes.
+    Writes take no lock. Each slot stores its key XORed with the two data words, and a probe
+    only accepts a slot whose words XOR back to the key, so a slot torn by two processes
+    writing at once reads as a miss instead of another position's result. The search
+    generation lives in the block too, so entries age the same way for every process.
+    """
+    def __init__(self, size_mb=16, name=None):
+        if name is None:
+            self.buckets = max(1, int(size_mb * 1024 * 1024) // (2 * SHARED_SLOT_BYTES))
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * SHARED_HEADER_WORDS
+                                                                   + 2 * self.buckets * SHARED_SLOT_BYTES)
+            self.shm.buf[:] = bytes(self.shm.size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.words = self.shm.buf.cast('Q')
+        self.buckets = (len(self.words) - SHARED_HEADER_WORDS) // (2 * SHARED_SLOT_WORDS)
+        self.size_mb = 2 * self.buckets * SHARED_SLOT_BYTES / (1024 * 1024)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self):
+        self.shm.buf[:] = bytes(self.shm.size)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Starts a new search generation, making the entries stored so far replaceable."""
+        self.words[0] = (self.words[0] + 1) & 0xFF
+
+    def probe(self, key):
+        """Returns (depth, bound, score, packed move) stored for key, or None."""
+        self.probes += 1
+        words = self.words
+        base = SHARED_HEADER_WORDS + (key % self.buckets) * 2 * SHARED_SLOT_WORDS
+        for slot in (base, base + SHARED_SLOT_WORDS):
+            score_bits = words[slot + 1]
+            info = words[slot + 2]
+            if words[slot] ^ score_bits ^ info == key:
+                self.hits += 1
+                return ((info >> 32) & 0xFF, (info >> 40) & 0xFF, _DOUBLE.unpack(_WORD.pack(score_bits))[0],
+                        info & 0xFFFFFFFF)
+        return None
+
+    def store(self, key, depth, bound, score, move=0):
+        self.stores += 1
+        words = self.words
+        generation = words[0]
+        slot = SHARED_HEADER_WORDS + (key % self.buckets) * 2 * SHARED_SLOT_WORDS
+        info = words[slot + 2]
+        if (words[slot] ^ words[slot + 1] ^ info != key and depth < (info >> 32) & 0xFF
+                and info >> 48 == generation):
+            slot += SHARED_SLOT_WORDS
+        score_bits = _WORD.unpack(_DOUBLE.pack(score))[0]
+        info = move | depth << 32 | bound << 40 | generation << 48
+        words[slot + 1] = score_bits
+        words[slot + 2] = info
+        words[slot] = key ^ score_bits ^ info
+
+    # same counters as the local table
+    stats = TranspositionTable.stats
+
+    def close(self):
+        """Detaches from the block; the process that created it also frees it."""
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()